@@ -7,7 +7,7 @@ from qgis.PyQt.QtCore import Qt, QTimer
 from qgis.PyQt.QtWidgets import (QMessageBox, QInputDialog, QLabel, QVBoxLayout, QPushButton, QWidget,
                                  QDialog, QScrollArea, QTextBrowser, QHBoxLayout)
 from qgis.core import (QgsRectangle, QgsWkbTypes, QgsProject, QgsGeometry, QgsPointXY,
-                       QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsFeatureRequest)
+                       QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsFeatureRequest, QgsExpression)
 from qgis.gui import QgsMapToolEmitPoint, QgsRubberBand
 
 
@@ -180,8 +180,8 @@ class ImageDisplayWidget(QWidget):
 
         # Delete corresponding feature only if it's a temp feature (was drawn but never sent to the MLLM)
         request = QgsFeatureRequest().setFilterExpression(
-            f'"ChipId" = \'{self.images[index_to_remove]["chip_id"]}\''
-        )
+            QgsExpression.createFieldEqualityExpression("ChipId", str(self.images[index_to_remove]["chip_id"]))
+        ).setFlags(QgsFeatureRequest.NoGeometry).setSubsetOfAttributes(["ChipId", "ImagePath"], self.log_layer.fields())
         for feature in self.log_layer.getFeatures(request):
             if str(feature["ImagePath"]) == "NULL":  # Needs to be a temp feature
                 self.log_layer.startEditing()
@@ -254,7 +254,10 @@ class ImageDisplayWidget(QWidget):
     def handle_single_click_action(self, img_metadata):
         """Actual single-click logic."""
         if img_metadata["chip_id"] is not None:
-            request = QgsFeatureRequest().setFilterExpression(f'"ChipId" = \'{img_metadata["chip_id"]}\'')
+            # Only the geometry is needed to zoom to the chip
+            request = QgsFeatureRequest().setFilterExpression(
+                QgsExpression.createFieldEqualityExpression("ChipId", str(img_metadata["chip_id"]))
+            ).setSubsetOfAttributes(["ChipId"], self.log_layer.fields())
             for feature in self.log_layer.getFeatures(request):
                 zoom_to_and_flash_feature(feature, self.canvas, self.log_layer)
                 return
@@ -346,7 +349,7 @@ class IdentifyDrawnAreaTool(QgsMapToolEmitPoint):
 
         # Could be optimized if we directly tracked the chips linked to each chat in the database
         all_chats = self.parent_dialog.logs_db.fetch_all_chats()
-        all_interactions = {interaction[0]: json.loads(interaction[3]) for interaction in self.parent_dialog.logs_db.fetch_all_interactions()}
+        all_interactions = {interaction[0]: json.loads(interaction[3]) for interaction in self.parent_dialog.logs_db.iter_interactions()}
         chats = {}
         for chat in all_chats:
             for interaction_id in json.loads(chat[1]):
@@ -420,7 +423,7 @@ class IdentifyDrawnAreaTool(QgsMapToolEmitPoint):
                 chat_html.split(f'<a name="{interaction_anchor}">')[0].split('<p style')[:-1] +
                 [chat_html.split(f'<a name="{interaction_anchor}">')[0].split('<p style')[-1].replace('="', '=" background-color: yellow;')]
             ) + f'<a name="{interaction_anchor}">' + chat_html.split(f'<a name="{interaction_anchor}">')[1]
-            self.parent_dialog.chat_history.setHtml(highlighted_html)
+            self.parent_dialog.set_chat_history_html(highlighted_html)
             self.parent_dialog.chat_history.scrollToAnchor(interaction_anchor)
             # Remove highlight after a short duration
             QTimer.singleShot(2000, lambda: self.remove_highlight(interaction_id))
@@ -437,5 +440,5 @@ class IdentifyDrawnAreaTool(QgsMapToolEmitPoint):
             highlighted_html.split(f'<a name="{interaction_anchor}">')[0].split('<p style')[:-1] +
             [highlighted_html.split(f'<a name="{interaction_anchor}">')[0].split('<p style')[-1].replace(' background-color:#ffff00;','')]
         ) + f'<a name="{interaction_anchor}">' + highlighted_html.split(f'<a name="{interaction_anchor}">')[1]
-        self.parent_dialog.chat_history.setHtml(chat_html)
+        self.parent_dialog.set_chat_history_html(chat_html)
         self.parent_dialog.chat_history.scrollToAnchor(interaction_anchor)
@@ -1,22 +1,198 @@
+import contextlib
+import functools
 import json
+import os
+import pathlib
+import queue
 import sqlite3
+import threading
 
 from .utils.logger import get_logger
 
 
+# Kept as module-level constants so every call submits the exact same SQL text
+# and hits the connection's prepared statement cache
+_SQL_INSERT_CHIP = (
+    "INSERT INTO Chips (image_path, geocoords, min_lon, min_lat, max_lon, max_lat) VALUES (?, ?, ?, ?, ?, ?)"
+)
+_SQL_INSERT_INTERACTION = (
+    "INSERT INTO Interactions (text_input, text_output, chips_sequence, mllm_service, mllm_model, "
+    "chips_mode_sequence, chips_original_resolutions, chips_actual_resolutions, reasoning_output) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_SQL_INSERT_CHAT = "INSERT INTO Chats (interactions_sequence, summary) VALUES (?, ?)"
+
+# Order of the values in the rows returned by the fetch_* and iter_* methods
+CHIP_COLUMNS = ("id", "image_path", "geocoords")
+INTERACTION_COLUMNS = (
+    "id", "text_input", "text_output", "chips_sequence", "mllm_service", "mllm_model", "chips_mode_sequence",
+    "chips_original_resolutions", "chips_actual_resolutions", "reasoning_output"
+)
+CHAT_COLUMNS = ("id", "interactions_sequence", "summary")
+
+_SQL_FETCH_ALL_CHIPS = f"SELECT {', '.join(CHIP_COLUMNS)} FROM Chips"
+_SQL_FETCH_CHIP_BY_ID = _SQL_FETCH_ALL_CHIPS + " WHERE id = ?"
+_SQL_FETCH_ALL_INTERACTIONS = f"SELECT {', '.join(INTERACTION_COLUMNS)} FROM Interactions"
+_SQL_FETCH_INTERACTION_BY_ID = _SQL_FETCH_ALL_INTERACTIONS + " WHERE id = ?"
+# Batched lookups, the IN (...) placeholders are filled in per batch
+_SQL_FETCH_CHIPS_BY_IDS = _SQL_FETCH_ALL_CHIPS + " WHERE id IN ({placeholders})"
+_SQL_FETCH_INTERACTIONS_BY_IDS = _SQL_FETCH_ALL_INTERACTIONS + " WHERE id IN ({placeholders})"
+_SQL_FETCH_ALL_CHATS = f"SELECT {', '.join(CHAT_COLUMNS)} FROM Chats"
+_SQL_FETCH_CHAT_BY_ID = _SQL_FETCH_ALL_CHATS + " WHERE id = ?"
+
+_SQL_UPDATE_CHAT_INTERACTIONS = "UPDATE Chats SET interactions_sequence = ? WHERE id = ?"
+# Appends to the JSON array inside SQLite (JSON1) without parsing it in Python
+_SQL_APPEND_CHAT_INTERACTION = (
+    "UPDATE Chats SET interactions_sequence = json_insert(interactions_sequence, '$[#]', ?) WHERE id = ?"
+)
+_SQL_UPDATE_CHAT_SUMMARY = "UPDATE Chats SET summary = ? WHERE id = ?"
+_SQL_UPDATE_CHIP_IMAGE_PATH = "UPDATE Chips SET image_path = ? WHERE id = ?"
+
+_SQL_FETCH_CHAT_INTERACTIONS = "SELECT interactions_sequence FROM Chats WHERE id = ?"
+_SQL_DELETE_CHAT = "DELETE FROM Chats WHERE id = ?"
+
+_SQL_INSERT_CHAT_INTERACTION = "INSERT OR IGNORE INTO ChatInteractions (chat_id, interaction_id) VALUES (?, ?)"
+_SQL_INSERT_INTERACTION_CHIP = "INSERT OR IGNORE INTO InteractionChips (interaction_id, chip_id) VALUES (?, ?)"
+_SQL_DELETE_CHAT_MEMBERSHIP = "DELETE FROM ChatInteractions WHERE chat_id = ?"
+# Chips used by a set of interactions, the IN (...) placeholders are filled in per batch
+_SQL_FETCH_CHIPS_FOR_INTERACTIONS = (
+    "SELECT DISTINCT c.id, c.image_path, c.geocoords FROM InteractionChips ic "
+    "JOIN Chips c ON c.id = ic.chip_id WHERE ic.interaction_id IN ({placeholders})"
+)
+# Chips referenced by the given chat that no other chat references
+_SQL_FETCH_CHIPS_ONLY_IN_CHAT = """
+    SELECT DISTINCT ic.chip_id, c.image_path
+    FROM InteractionChips ic
+    JOIN ChatInteractions ci ON ci.interaction_id = ic.interaction_id
+    JOIN Chips c ON c.id = ic.chip_id
+    WHERE ci.chat_id = ?
+      AND NOT EXISTS (
+          SELECT 1
+          FROM InteractionChips ic2
+          JOIN ChatInteractions ci2 ON ci2.interaction_id = ic2.interaction_id
+          WHERE ic2.chip_id = ic.chip_id AND ci2.chat_id != ?
+      )
+"""
+
+_SQL_FETCH_ALL_CHIP_IDS = "SELECT id FROM Chips"
+_SQL_FETCH_CHIP_BOUNDS = "SELECT min_lon, min_lat, max_lon, max_lat FROM Chips WHERE id = ?"
+_SQL_UPDATE_CHIP_BOUNDS = "UPDATE Chips SET min_lon = ?, min_lat = ?, max_lon = ?, max_lat = ? WHERE id = ?"
+
+def _to_json(value):
+    """Compact JSON encoding used for every JSON column, the same form json_insert produces"""
+    return json.dumps(value, separators=(",", ":"))
+
+
+def _to_json_or_null(value):
+    """_to_json for optional columns, None is stored as SQL NULL"""
+    return None if value is None else _to_json(value)
+
+
+# Rows pulled from SQLite per fetchmany call when streaming whole tables
+_FETCH_BATCH_SIZE = 1024
+
+# Stays well below SQLite's default limit of 999 bound parameters per statement
+_ID_BATCH_SIZE = 500
+
+
 class LogsDB:
     # Current database schema version
-    CURRENT_VERSION = 2
+    CURRENT_VERSION = 6
+    # Size of the per-connection LRU of compiled statements
+    CACHED_STATEMENTS = 256
+    # Maximum number of rows kept by each of the fetch_*_by_id caches
+    FETCH_CACHE_SIZE = 1024
+    # Maximum number of idle read-only connections kept open for the fetch_* and iter_* methods
+    READ_POOL_SIZE = 4
     
     def __init__(self, db_path):
         self.db_path = db_path
         self.logger = get_logger(__name__)
+        # A single read-write connection, serialized by the lock, and a pool of read-only connections
+        self._conn = None
+        self._lock = threading.RLock()
+        self._read_pool = queue.Queue()
+        # Per-instance caches for point lookups, cleared by the methods that modify the cached tables
+        self._chip_cache = functools.lru_cache(maxsize=self.FETCH_CACHE_SIZE)(self._fetch_chip_by_id)
+        self._interaction_cache = functools.lru_cache(maxsize=self.FETCH_CACHE_SIZE)(self._fetch_interaction_by_id)
+        self._chat_cache = functools.lru_cache(maxsize=self.FETCH_CACHE_SIZE)(self._fetch_chat_by_id)
+
+    def _get_conn(self):
+        """Return the shared read-write connection, opening it on first use"""
+        with self._lock:
+            if self._conn is None:
+                conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                                       cached_statements=self.CACHED_STATEMENTS)
+                # Applied once per connection instead of on every query
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                self._apply_cache_pragmas(conn)
+                self._conn = conn
+            return self._conn
+
+    def _open_reader(self):
+        # WAL mode lets these read concurrently with the writer, they only ever see committed data
+        uri = pathlib.Path(os.path.abspath(self.db_path)).as_uri() + "?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False,
+                               cached_statements=self.CACHED_STATEMENTS)
+        self._apply_cache_pragmas(conn)
+        return conn
+
+    @staticmethod
+    def _apply_cache_pragmas(conn):
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-64000")
+        # Read pages straight from a 256 MB memory map instead of copying them through read() calls
+        conn.execute("PRAGMA mmap_size=268435456")
+
+    @contextlib.contextmanager
+    def bulk_load(self):
+        """Hold the writer and skip fsyncs while importing many rows, e.g. with save_chips_many
+
+        A crash during the block can lose the rows written in it, so only use it for imports that can be rerun.
+        """
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute("PRAGMA synchronous=OFF")
+            try:
+                yield self
+            finally:
+                conn.execute("PRAGMA synchronous=NORMAL")
+
+    @contextlib.contextmanager
+    def _reader(self):
+        """Borrow a read-only connection from the pool, opening a new one if none is idle"""
+        # Make sure the writer has created the database and switched it to WAL first
+        self._get_conn()
+        try:
+            conn = self._read_pool.get_nowait()
+        except queue.Empty:
+            conn = self._open_reader()
+        try:
+            yield conn
+        finally:
+            if self._read_pool.qsize() < self.READ_POOL_SIZE:
+                self._read_pool.put(conn)
+            else:
+                conn.close()
+
+    def close(self):
+        """Close all connections (they are reopened lazily if used again)"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            while True:
+                try:
+                    self._read_pool.get_nowait().close()
+                except queue.Empty:
+                    break
 
     def initialize_database(self):
         """Initialize the database or migrate it if necessary"""
         # Check if database exists and needs migration
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._get_conn()
             cursor = conn.cursor()
             
             # Check if SchemaVersion table exists
@@ -37,7 +213,7 @@ class LogsDB:
                 if current_version < self.CURRENT_VERSION:
                     self._migrate_database(conn, cursor, current_version)
             
-            conn.close()
+            cursor.close()
             
         except sqlite3.Error as e:
             self.logger.error(f"Database initialization error: {e}")
@@ -45,11 +221,6 @@ class LogsDB:
     
     def _setup_new_database(self, conn, cursor):
         """Set up a new database or add versioning to existing one"""
-        # Enable WAL mode for better performance with concurrent reads/writes
-        conn.execute("PRAGMA journal_mode=WAL")
-        # Ensure synchronous mode is set for best performance while maintaining integrity
-        conn.execute("PRAGMA synchronous=NORMAL")
-        
         # Check if tables already exist (old database without versioning)
         cursor.execute("""
             SELECT name FROM sqlite_master 
@@ -71,7 +242,11 @@ class LogsDB:
             CREATE TABLE IF NOT EXISTS Chips (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 image_path TEXT NOT NULL,
-                geocoords TEXT NOT NULL
+                geocoords TEXT NOT NULL,
+                min_lon REAL,
+                min_lat REAL,
+                max_lon REAL,
+                max_lat REAL
             )
         """)
 
@@ -97,11 +272,8 @@ class LogsDB:
                 summary TEXT NOT NULL
             )
         """)
-        
-        # Create indexes to speed up common queries
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_chip_id ON Chips(id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_chat_id ON Chats(id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_interaction_id ON Interactions(id)")
+
+        self._create_membership_tables(cursor)
         
         # Create version tracking table
         cursor.execute("""
@@ -133,8 +305,10 @@ class LogsDB:
             
             # Determine version based on structure
             if 'chips_original_resolutions' in columns and 'chips_actual_resolutions' in columns:
-                cursor.execute("INSERT INTO SchemaVersion (version) VALUES (?)", (self.CURRENT_VERSION,))
-                self.logger.info(f"Added version tracking to existing database - current version: {self.CURRENT_VERSION}")
+                # Version 1 structure, later migrations are idempotent so apply them all
+                cursor.execute("INSERT INTO SchemaVersion (version) VALUES (?)", (1,))
+                self.logger.info("Added version tracking to existing database - needs migration from version 1")
+                self._migrate_database(conn, cursor, 1)
             else:
                 # Old structure, needs migration
                 cursor.execute("INSERT INTO SchemaVersion (version) VALUES (?)", (0,))
@@ -158,6 +332,14 @@ class LogsDB:
                 self._migrate_to_v1(conn, cursor)
             if from_version < 2:
                 self._migrate_to_v2(conn, cursor)
+            if from_version < 3:
+                self._migrate_to_v3(conn, cursor)
+            if from_version < 4:
+                self._migrate_to_v4(conn, cursor)
+            if from_version < 5:
+                self._migrate_to_v5(conn, cursor)
+            if from_version < 6:
+                self._migrate_to_v6(conn, cursor)
             
             # Update schema version
             cursor.execute("UPDATE SchemaVersion SET version = ?", (self.CURRENT_VERSION,))
@@ -199,205 +381,354 @@ class LogsDB:
 
         conn.commit()
 
-    def save_chip(self, image_path, geocoords):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def _migrate_to_v3(self, conn, cursor):
+        """Migrate database to version 3"""
+        self.logger.info("Applying migration to version 3")
+
+        self._create_membership_tables(cursor)
+
+        # Backfill the membership tables from the JSON sequences
+        cursor.execute("DELETE FROM ChatInteractions")
+        cursor.execute("DELETE FROM InteractionChips")
+        cursor.execute("SELECT id, interactions_sequence FROM Chats")
+        chat_rows = [
+            (chat_id, interaction_id)
+            for chat_id, sequence in cursor.fetchall()
+            for interaction_id in json.loads(sequence)
+        ]
+        cursor.executemany(_SQL_INSERT_CHAT_INTERACTION, chat_rows)
+        cursor.execute("SELECT id, chips_sequence FROM Interactions")
+        interaction_rows = [
+            (interaction_id, chip_id)
+            for interaction_id, sequence in cursor.fetchall()
+            for chip_id in json.loads(sequence)
+        ]
+        cursor.executemany(_SQL_INSERT_INTERACTION_CHIP, interaction_rows)
+        self.logger.info("Created and populated ChatInteractions and InteractionChips tables")
 
-        cursor.execute("""
-            INSERT INTO Chips (image_path, geocoords)
-            VALUES (?, ?)
-        """, (image_path, str(geocoords)))
+        conn.commit()
+
+    def _migrate_to_v4(self, conn, cursor):
+        """Migrate database to version 4"""
+        self.logger.info("Applying migration to version 4")
+
+        # These duplicated the INTEGER PRIMARY KEY (rowid) lookup and only slowed down inserts
+        for index_name in ("idx_chip_id", "idx_chat_id", "idx_interaction_id"):
+            cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+        self.logger.info("Dropped redundant primary key indexes")
 
-        chip_id = cursor.lastrowid
         conn.commit()
-        conn.close()
-        return chip_id
 
-    def save_interaction(self, text_input, text_output, chips_sequence, mllm_service, mllm_model,
-                         chips_mode_sequence, chips_original_resolutions=None, chips_actual_resolutions=None,
-                         reasoning_output=None):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def _migrate_to_v5(self, conn, cursor):
+        """Migrate database to version 5"""
+        self.logger.info("Applying migration to version 5")
+
+        cursor.execute("PRAGMA table_info(Chips)")
+        columns = {column[1] for column in cursor.fetchall()}
+
+        for column in ("min_lon", "min_lat", "max_lon", "max_lat"):
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE Chips ADD COLUMN {column} REAL")
+        self.logger.info("Added bounding box columns to Chips table")
+
+        cursor.execute("SELECT id, geocoords FROM Chips")
+        cursor.executemany(_SQL_UPDATE_CHIP_BOUNDS, [
+            (*self._geocoords_bounds(json.loads(geocoords)), chip_id)
+            for chip_id, geocoords in cursor.fetchall()
+        ])
 
-        cursor.execute("""
-            INSERT INTO Interactions (text_input, text_output, chips_sequence, mllm_service, mllm_model,
-                                     chips_mode_sequence, chips_original_resolutions, chips_actual_resolutions,
-                                     reasoning_output)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (text_input, text_output, str(chips_sequence), mllm_service, mllm_model, 
-              str(chips_mode_sequence), str(chips_original_resolutions), str(chips_actual_resolutions),
-              reasoning_output))
-
-        interaction_id = cursor.lastrowid
         conn.commit()
-        conn.close()
-        return interaction_id
 
-    def save_chat(self, interactions_sequence):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def _migrate_to_v6(self, conn, cursor):
+        """Migrate database to version 6"""
+        self.logger.info("Applying migration to version 6")
+
+        # Rebuild the membership tables as WITHOUT ROWID tables keyed by their id pairs
+        for index_name in ("idx_chat_interactions_chat", "idx_chat_interactions_interaction",
+                           "idx_interaction_chips_chip", "idx_interaction_chips_interaction"):
+            cursor.execute(f"DROP INDEX IF EXISTS {index_name}")
+        for table in ("ChatInteractions", "InteractionChips"):
+            cursor.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+        self._create_membership_tables(cursor)
+        cursor.execute("INSERT OR IGNORE INTO ChatInteractions SELECT chat_id, interaction_id FROM ChatInteractions_old")
+        cursor.execute("INSERT OR IGNORE INTO InteractionChips SELECT interaction_id, chip_id FROM InteractionChips_old")
+        for table in ("ChatInteractions", "InteractionChips"):
+            cursor.execute(f"DROP TABLE {table}_old")
+        self.logger.info("Rebuilt ChatInteractions and InteractionChips as WITHOUT ROWID tables")
 
+        conn.commit()
+
+    @staticmethod
+    def _geocoords_bounds(geocoords):
+        """Return (min_lon, min_lat, max_lon, max_lat) of a list of [lon, lat] points"""
+        if not geocoords:
+            return None, None, None, None
+        # zip() transposes the points in C instead of two Python-level list comprehensions
+        lons, lats = zip(*geocoords)
+        return min(lons), min(lats), max(lons), max(lats)
+
+    @staticmethod
+    def _create_membership_tables(cursor):
+        """Create the tables mirroring the chat -> interactions -> chips sequences"""
+        # Pure integer pairs, so the primary key B-tree holds the whole row
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ChatInteractions (
+                chat_id INTEGER NOT NULL,
+                interaction_id INTEGER NOT NULL,
+                PRIMARY KEY (chat_id, interaction_id)
+            ) WITHOUT ROWID
+        """)
         cursor.execute("""
-            INSERT INTO Chats (interactions_sequence, summary)
-            VALUES (?, ?)
-        """, (str(interactions_sequence), "",))
+            CREATE TABLE IF NOT EXISTS InteractionChips (
+                interaction_id INTEGER NOT NULL,
+                chip_id INTEGER NOT NULL,
+                PRIMARY KEY (chip_id, interaction_id)
+            ) WITHOUT ROWID
+        """)
+        # Secondary indexes on WITHOUT ROWID tables also carry the primary key, so they are covering
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_chat_interactions_interaction ON ChatInteractions(interaction_id)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_interaction_chips_interaction ON InteractionChips(interaction_id)"
+        )
 
-        chat_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+    def save_chip(self, image_path, geocoords):
+        return self.save_chips_many([(image_path, geocoords)])[0]
+
+    def save_chips_many(self, rows):
+        """Save (image_path, geocoords) rows in a single transaction and return their ids in order"""
+        with self._lock:
+            conn = self._get_conn()
+            with conn:
+                chip_ids = [
+                    conn.execute(_SQL_INSERT_CHIP,
+                                 (image_path, _to_json(geocoords), *self._geocoords_bounds(geocoords))).lastrowid
+                    for image_path, geocoords in rows
+                ]
+            # Lookups of ids that did not exist yet may have cached None
+            self._chip_cache.cache_clear()
+        return chip_ids
+
+    def save_interaction(self, text_input, text_output, chips_sequence, mllm_service, mllm_model,
+                         chips_mode_sequence, chips_original_resolutions=None, chips_actual_resolutions=None,
+                         reasoning_output=None):
+        return self.save_interactions_many([(text_input, text_output, chips_sequence, mllm_service, mllm_model,
+                                             chips_mode_sequence, chips_original_resolutions,
+                                             chips_actual_resolutions, reasoning_output)])[0]
+
+    def save_interactions_many(self, rows):
+        """Save rows of save_interaction arguments in a single transaction and return their ids in order"""
+        with self._lock:
+            conn = self._get_conn()
+            with conn:
+                interaction_ids = [self._insert_interaction(conn, *row) for row in rows]
+            self._interaction_cache.cache_clear()
+        return interaction_ids
+
+    @staticmethod
+    def _insert_interaction(conn, text_input, text_output, chips_sequence, mllm_service, mllm_model,
+                            chips_mode_sequence, chips_original_resolutions=None, chips_actual_resolutions=None,
+                            reasoning_output=None):
+        interaction_id = conn.execute(_SQL_INSERT_INTERACTION,
+                                      (text_input, text_output, _to_json(chips_sequence), mllm_service, mllm_model,
+                                       _to_json(chips_mode_sequence), _to_json_or_null(chips_original_resolutions),
+                                       _to_json_or_null(chips_actual_resolutions), reasoning_output)).lastrowid
+
+        conn.executemany(_SQL_INSERT_INTERACTION_CHIP,
+                         [(interaction_id, chip_id) for chip_id in chips_sequence])
+        return interaction_id
+
+    def save_chat(self, interactions_sequence):
+        with self._lock:
+            conn = self._get_conn()
+            with conn:
+                chat_id = conn.execute(_SQL_INSERT_CHAT, (_to_json(interactions_sequence), "")).lastrowid
+                conn.executemany(_SQL_INSERT_CHAT_INTERACTION,
+                                 [(chat_id, interaction_id) for interaction_id in interactions_sequence])
+            self._chat_cache.cache_clear()
         return chat_id
 
     def fetch_all_chips(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return list(self.iter_chips())
+
+    def iter_chips(self, batch_size=_FETCH_BATCH_SIZE):
+        """Yield chips rows without materializing the whole table"""
+        return self._iter_rows(_SQL_FETCH_ALL_CHIPS, batch_size)
 
-        cursor.execute("SELECT * FROM Chips")
-        chips = cursor.fetchall()
-        conn.close()
-        return chips
+    def iter_chip_ids(self, batch_size=_FETCH_BATCH_SIZE):
+        """Yield only the chip ids, for callers that don't need the other columns"""
+        for (chip_id,) in self._iter_rows(_SQL_FETCH_ALL_CHIP_IDS, batch_size):
+            yield chip_id
 
     def fetch_chip_by_id(self, chip_id):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return self._chip_cache(chip_id)
 
-        cursor.execute("SELECT * FROM Chips WHERE id = ?", (chip_id,))
-        chip = cursor.fetchone()
-        conn.close()
+    def _fetch_chip_by_id(self, chip_id):
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_FETCH_CHIP_BY_ID, (chip_id,))
+            chip = cursor.fetchone()
+            cursor.close()
         return chip
 
+    def fetch_chips_by_ids(self, chip_ids):
+        """Fetch several chips in as few queries as possible, as a {chip_id: row} dict (missing ids are left out)"""
+        return self._fetch_rows_by_ids(_SQL_FETCH_CHIPS_BY_IDS, chip_ids)
+
+    def fetch_chip_bounds(self, chip_id):
+        """Return the chip's (min_lon, min_lat, max_lon, max_lat), or None if there is no such chip"""
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_FETCH_CHIP_BOUNDS, (chip_id,))
+            bounds = cursor.fetchone()
+            cursor.close()
+        return bounds
+
     def fetch_all_interactions(self):
-        conn = sqlite3.connect(self.db_path)
-        # Enable WAL mode for better performance with concurrent reads/writes
-        conn.execute("PRAGMA journal_mode=WAL")
-        cursor = conn.cursor()
+        return list(self.iter_interactions())
 
-        cursor.execute("SELECT * FROM Interactions")
-        interactions = cursor.fetchall()
-        conn.close()
-        return interactions
+    def iter_interactions(self, batch_size=_FETCH_BATCH_SIZE):
+        """Yield interactions rows without materializing the whole table"""
+        return self._iter_rows(_SQL_FETCH_ALL_INTERACTIONS, batch_size)
 
     def fetch_interaction_by_id(self, interaction_id):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return self._interaction_cache(interaction_id)
 
-        cursor.execute("SELECT * FROM Interactions WHERE id = ?", (interaction_id,))
-        interaction = cursor.fetchone()
-        conn.close()
+    def _fetch_interaction_by_id(self, interaction_id):
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_FETCH_INTERACTION_BY_ID, (interaction_id,))
+            interaction = cursor.fetchone()
+            cursor.close()
         return interaction
 
+    def fetch_interactions_by_ids(self, interaction_ids):
+        """Fetch several interactions in as few queries as possible, as a {interaction_id: row} dict"""
+        return self._fetch_rows_by_ids(_SQL_FETCH_INTERACTIONS_BY_IDS, interaction_ids)
+
     def fetch_all_chats(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return list(self.iter_chats())
 
-        cursor.execute("SELECT * FROM Chats")
-        chats = cursor.fetchall()
-        conn.close()
-        return chats
+    def iter_chats(self, batch_size=_FETCH_BATCH_SIZE):
+        """Yield chats rows without materializing the whole table"""
+        return self._iter_rows(_SQL_FETCH_ALL_CHATS, batch_size)
 
     def fetch_chat_by_id(self, chat_id):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return self._chat_cache(chat_id)
 
-        cursor.execute("SELECT * FROM Chats WHERE id = ?", (chat_id,))
-        chat = cursor.fetchone()
-        conn.close()
+    def _fetch_chat_by_id(self, chat_id):
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_FETCH_CHAT_BY_ID, (chat_id,))
+            chat = cursor.fetchone()
+            cursor.close()
         return chat
 
-    def add_new_interaction_to_chat(self, chat_id, interaction_id):
-        chats = self.fetch_all_chats()
-        selected_chat = next(chat for chat in chats if chat[0] == chat_id)
-        interactions_sequence = json.loads(selected_chat[1])
-
-        # Append the new interaction ID
-        interactions_sequence.append(interaction_id)
+    def _iter_rows(self, sql, batch_size):
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            cursor.arraysize = batch_size
+            try:
+                cursor.execute(sql)
+                while True:
+                    rows = cursor.fetchmany()
+                    if not rows:
+                        break
+                    yield from rows
+            finally:
+                cursor.close()
+
+    def _fetch_rows_by_ids(self, sql, ids):
+        ids = list(dict.fromkeys(ids))
+        rows = {}
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(ids), _ID_BATCH_SIZE):
+                batch = ids[start:start + _ID_BATCH_SIZE]
+                cursor.execute(sql.format(placeholders=",".join("?" * len(batch))), batch)
+                for row in cursor.fetchall():
+                    rows[row[0]] = row
+            cursor.close()
+        return rows
+
+    def fetch_chips_for_interactions(self, interaction_ids):
+        """Fetch the distinct chips used by the given interactions, in as few queries as possible"""
+        interaction_ids = list(interaction_ids)
+        chips = {}
+        with self._reader() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(interaction_ids), _ID_BATCH_SIZE):
+                batch = interaction_ids[start:start + _ID_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                cursor.execute(_SQL_FETCH_CHIPS_FOR_INTERACTIONS.format(placeholders=placeholders), batch)
+                for chip in cursor.fetchall():
+                    chips[chip[0]] = chip
+            cursor.close()
+        return list(chips.values())
 
-        # Update the chat in the database
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE Chats SET interactions_sequence = ? WHERE id = ?",
-            (json.dumps(interactions_sequence), chat_id),
-        )
-        conn.commit()
-        conn.close()
+    def add_new_interaction_to_chat(self, chat_id, interaction_id):
+        with self._lock:
+            conn = self._get_conn()
+            with conn:
+                try:
+                    conn.execute(_SQL_APPEND_CHAT_INTERACTION, (interaction_id, chat_id))
+                except sqlite3.OperationalError:
+                    # SQLite built without JSON1, append in Python instead
+                    interactions_sequence = json.loads(conn.execute(_SQL_FETCH_CHAT_INTERACTIONS, (chat_id,)).fetchone()[0])
+                    interactions_sequence.append(interaction_id)
+                    conn.execute(_SQL_UPDATE_CHAT_INTERACTIONS, (_to_json(interactions_sequence), chat_id))
+                conn.execute(_SQL_INSERT_CHAT_INTERACTION, (chat_id, interaction_id))
+            self._chat_cache.cache_clear()
 
     def update_chat_summary(self, chat_id, summary):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
-            "UPDATE Chats SET summary = ? WHERE id = ?",
-            (summary, chat_id),
-        )
-        conn.commit()
-        conn.close()
+        with self._lock:
+            conn = self._get_conn()
+            with conn:
+                conn.execute(_SQL_UPDATE_CHAT_SUMMARY, (summary, chat_id))
+            self._chat_cache.cache_clear()
 
     def update_chip_image_path(self, chip_id, image_path):
         """Update the image path for a chip"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE Chips SET image_path = ? WHERE id = ?",
-            (image_path, chip_id)
-        )
-        conn.commit()
-        conn.close()
-
+        with self._lock:
+            conn = self._get_conn()
+            with conn:
+                conn.execute(_SQL_UPDATE_CHIP_IMAGE_PATH, (image_path, chip_id))
+            self._chip_cache.cache_clear()
 
     def delete_chat(self, chat_id, delete_chips):
         """Delete a chat and its associated data"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Get chat's interactions
-        cursor.execute("SELECT interactions_sequence FROM Chats WHERE id = ?", (chat_id,))
-        interactions_sequence = json.loads(cursor.fetchone()[0])
-
-        if delete_chips:
-            # Get chips associated with these interactions
-            chips_to_check = set()
-            for interaction_id in interactions_sequence:
-                cursor.execute("SELECT chips_sequence FROM Interactions WHERE id = ?", (interaction_id,))
-                chips_sequence = json.loads(cursor.fetchone()[0])
-                chips_to_check.update(chips_sequence)
-
-            # For each chip, check if it's used in other chats' interactions
-            chips_to_delete = set()
-            for chip_id in chips_to_check:
-                is_used = False
-                # Get all interactions from other chats
-                cursor.execute("SELECT interactions_sequence FROM Chats WHERE id != ?", (chat_id,))
-                other_chats_interactions = []
-                for chat in cursor.fetchall():
-                    other_chats_interactions.extend(json.loads(chat[0]))
-
-                # Get chips from those interactions
-                for interaction_id in other_chats_interactions:
-                    cursor.execute("SELECT chips_sequence FROM Interactions WHERE id = ?", (interaction_id,))
-                    other_interaction = cursor.fetchone()
-                    other_chips = json.loads(other_interaction[0])
-                    if chip_id in other_chips:
-                        is_used = True
-                        break
-                if not is_used:
-                    chips_to_delete.add(chip_id)
-                    cursor.execute("SELECT image_path FROM Chips WHERE id = ?", (chip_id,))
-                    image_path = cursor.fetchone()[0]
-                    # Return image paths for deletion
-                    yield image_path, chip_id
-        else:
-            chips_to_delete = []
+        with self._lock:
+            conn = self._get_conn()
 
-        # Delete interactions
-        for interaction_id in interactions_sequence:
-            cursor.execute("DELETE FROM Interactions WHERE id = ?", (interaction_id,))
+            # Get chat's interactions
+            interactions_sequence = json.loads(conn.execute(_SQL_FETCH_CHAT_INTERACTIONS, (chat_id,)).fetchone()[0])
 
-        # Delete chips
-        for chip_id in chips_to_delete:
-            cursor.execute("DELETE FROM Chips WHERE id = ?", (chip_id,))
-
-        # Delete chat
-        cursor.execute("DELETE FROM Chats WHERE id = ?", (chat_id,))
-
-        conn.commit()
-        conn.close()
+            # Work out which chips can go before touching anything
+            chips_to_delete = []
+            if delete_chips:
+                chips_to_delete = [(image_path, chip_id) for chip_id, image_path
+                                   in conn.execute(_SQL_FETCH_CHIPS_ONLY_IN_CHAT, (chat_id, chat_id))]
+
+            # All deletions are committed together in a single transaction
+            with conn:
+                self._delete_ids(conn, "Interactions", interactions_sequence)
+                self._delete_ids(conn, "Chips", [chip_id for _, chip_id in chips_to_delete])
+                self._delete_ids(conn, "InteractionChips", interactions_sequence, column="interaction_id")
+                conn.execute(_SQL_DELETE_CHAT_MEMBERSHIP, (chat_id,))
+                conn.execute(_SQL_DELETE_CHAT, (chat_id,))
+            self._chip_cache.cache_clear()
+            self._interaction_cache.cache_clear()
+            self._chat_cache.cache_clear()
+
+        # Return image paths for deletion
+        yield from chips_to_delete
+
+    @staticmethod
+    def _delete_ids(conn, table, ids, column="id"):
+        """Delete rows by id using batched DELETE ... WHERE <column> IN (...) statements"""
+        ids = list(ids)
+        for start in range(0, len(ids), _ID_BATCH_SIZE):
+            batch = ids[start:start + _ID_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            conn.execute(f"DELETE FROM {table} WHERE {column} IN ({placeholders})", batch)
@@ -1,6 +1,9 @@
 import os
 import math
+import asyncio
+import threading
 import copy
+import functools
 import json
 import io
 import base64
@@ -9,18 +12,19 @@ import subprocess
 import platform
 import shutil
 import datetime
-import boto3
 import tempfile
 import ntpath
 from PIL import Image
-import markdown
 import urllib.parse
 import ast
 import re
-import requests
-import litellm
 import traceback
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from .settings import SettingsDialog
 from .db import LogsDB
 from .utils import raw_image_utils as ru
@@ -30,7 +34,7 @@ from .custom_qt import (zoom_to_and_flash_feature, CustomTextBrowser, ImageDispl
 
 from qgis.PyQt.QtGui import QPixmap, QImage, QColor, QTextOption, QPalette
 from qgis.PyQt.QtCore import (QBuffer, QByteArray, Qt, QSettings, QVariant, QSize, QTimer, QSignalBlocker,
-                              QObject, QThread, pyqtSignal, pyqtSlot, QMetaObject)
+                              QObject, pyqtSignal, pyqtSlot, QMetaObject)
 from qgis.PyQt.QtWidgets import (QSizePolicy, QFileDialog, QMessageBox, QInputDialog, QComboBox, QLabel, QVBoxLayout,
                                  QPushButton, QWidget, QTextEdit, QApplication, QRadioButton, QHBoxLayout, QDockWidget,
                                  QSplitter, QListWidget, QListWidgetItem, QDialog, QTextBrowser, QCheckBox, QLineEdit,
@@ -38,7 +42,7 @@ from qgis.PyQt.QtWidgets import (QSizePolicy, QFileDialog, QMessageBox, QInputDi
 from qgis.core import (QgsVectorLayer, QgsRasterLayer, QgsSymbol, QgsSimpleLineSymbolLayer, QgsUnitTypes,
                        QgsRectangle, QgsWkbTypes, QgsProject, QgsGeometry, QgsMapRendererParallelJob, QgsFeature,
                        QgsField, QgsVectorFileWriter, QgsCoordinateReferenceSystem, QgsCoordinateTransform,
-                       QgsFeatureRequest, QgsLayerTreeLayer)
+                       QgsFeatureRequest, QgsLayerTreeLayer, QgsVectorDataProvider, QgsExpression, QgsMapSettings)
 
 
 logger = get_logger(__name__)
@@ -46,6 +50,241 @@ logger = get_logger(__name__)
 
 API_KEY_SENTINEL = "__LIBREGEOLENS_API_KEY__"
 
+# Valid manual reasoning override states; "auto" is represented by the model having no override
+_REASONING_OVERRIDE_STATES = frozenset(("force_on", "force_off"))
+
+_IS_MACOS = platform.system() == "Darwin"
+
+# Styles applied to the dock when QGIS uses a dark theme
+_DARK_QGIS_THEMES = ("Night Mapping", "Blend of Gray")
+_DARK_CHAT_HISTORY_STYLE = """
+background-color: #2b2b2b;
+color: #ffffff;
+border: 1px solid #555;
+"""
+_DARK_IMAGE_DISPLAY_STYLE = """
+background-color: #2b2b2b;
+"""
+
+_BUTTON_QSS_TEMPLATE = (
+    "QPushButton {{"
+    "padding: 10px; font-weight: 600;"
+    "background-color: {enabled_color}; color: white;"
+    "}}"
+    "QPushButton:hover {{ background-color: {enabled_color}; }}"
+    "QPushButton:pressed {{ background-color: {pressed_color}; }}"
+    "QPushButton:disabled {{ background-color: {disabled_color}; color: #F2F2F2; }}"
+)
+_SEND_BUTTON_QSS = _BUTTON_QSS_TEMPLATE.format(
+    enabled_color="#2E7D32",
+    pressed_color="#2E7D32",
+    disabled_color="#A5D6A7",
+)
+_CANCEL_BUTTON_QSS = _BUTTON_QSS_TEMPLATE.format(
+    enabled_color="#C62828",
+    pressed_color="#C62828",
+    disabled_color="#EF9A9A",
+)
+
+
+_JSON_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+def _is_plain_json(obj):
+    """Whether obj survives a JSON round-trip unchanged: dicts with str keys, lists and JSON scalars only"""
+    obj_type = type(obj)
+    if obj_type is dict:
+        return all(type(key) is str and _is_plain_json(value) for key, value in obj.items())
+    if obj_type is list:
+        return all(_is_plain_json(value) for value in obj)
+    return obj_type in _JSON_SCALAR_TYPES
+
+
+def _fast_clone(obj):
+    """Deep copy with a JSON round-trip when obj is plain JSON data, with copy.deepcopy otherwise
+
+    The round-trip is much cheaper than copy.deepcopy for nested dicts, but it would turn tuples into lists
+    and non-str dict keys into strings, so anything else goes through copy.deepcopy.
+    """
+    if _is_plain_json(obj):
+        return json.loads(json.dumps(obj))
+    return copy.deepcopy(obj)
+
+
+# GDAL options for reading remote COGs (QGIS raster layers and rasterio chips), applied with setdefault
+# so values set by the user or QGIS still win:
+# - don't list the remote "directory" looking for sidecar files when opening a COG
+# - cache and merge the HTTP range reads of a file
+_GDAL_COG_CONFIG = {
+    "GDAL_DISABLE_READDIR_ON_OPEN": "EMPTY_DIR",
+    "VSI_CACHE": "TRUE",
+    "GDAL_HTTP_MERGE_CONSECUTIVE_RANGES": "YES",
+}
+
+
+def _configure_gdal_for_cogs():
+    for key, value in _GDAL_COG_CONFIG.items():
+        os.environ.setdefault(key, value)
+
+
+@functools.lru_cache(maxsize=1)
+def _litellm():
+    """Import litellm on first use, it is slow to import and only needed once a model is queried"""
+    import litellm
+    return litellm
+
+
+@functools.lru_cache(maxsize=512)
+def _litellm_supports_vision(model_name):
+    """(supports_vision, error message or None) for a model, looked up once per session in litellm's registry"""
+    try:
+        return _litellm().supports_vision(model=model_name), None
+    except Exception as exc:
+        return None, str(exc).strip()
+
+
+@functools.lru_cache(maxsize=256)
+def _litellm_supports_reasoning(model_name):
+    """litellm's reasoning capability for a model; it only depends on litellm's bundled model registry"""
+    try:
+        return _litellm().supports_reasoning(model=model_name)
+    except Exception:
+        return False
+
+
+# First characters of text json.loads / ast.literal_eval can parse (string prefixes included), plus bare keywords
+_LITERAL_START_CHARS = frozenset("\"'[{(-+.0123456789bBrRuU")
+_LITERAL_KEYWORDS = frozenset(("true", "false", "null", "True", "False", "None", "NaN", "Infinity"))
+
+
+def _settings_dumps(value):
+    """Serialize a value stored as JSON text in QSettings, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value, separators=(",", ":"))  # Same compact form orjson produces
+
+
+def _settings_loads(text):
+    """Parse JSON text stored in QSettings; both backends raise json.JSONDecodeError on bad input"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _load_sequence_column(text):
+    """Parse a list column of the Interactions table, written as JSON but holding Python reprs in older logs"""
+    if not text:
+        return None
+    try:
+        return json.loads(text)
+    except ValueError:
+        return ast.literal_eval(text)
+
+
+@functools.lru_cache(maxsize=1)
+def _markdown_converter():
+    import markdown
+    return markdown.Markdown()
+
+
+def _markdown_to_html(text):
+    """Same output as markdown.markdown(text), but reuses one Markdown instance instead of building one per call"""
+    return _markdown_converter().reset().convert(text)
+
+
+# Label shown for each chip mode, anything but raw is a screen capture
+_CHIP_MODE_LABELS = {"raw": "Raw"}
+_DEFAULT_CHIP_MODE_LABEL = "Screen"
+
+# Chip thumbnails in the chat history; the text color is filled in once per dock, the rest per chip
+_CHIP_HTML_TEMPLATE = (
+    '<div style="position: relative; display: inline-block;">'
+    '    <a href="image://{image_path}" style="text-decoration: none;">'
+    '        <img src="file:///{image_path}" width="75" loading="lazy"/>'
+    '    </a>'
+    '    <span style="position: absolute; top: 3px; right: 5px; color: %(color)s; font-size: 10px">'
+    '        ({mode_label} Chip)'
+    '    </span>'
+    '{resolution_span}'
+    '</div>'
+)
+_CHIP_RESOLUTION_TEMPLATE = (
+    '<span style="position: absolute; bottom: 3px; left: 5px; color: %(color)s; '
+    'font-size: 10px">{resolution_text}</span>'
+)
+
+# Inline styles given to the block elements of rendered reasoning sections
+_REASONING_BLOCK_STYLES = {
+    "p": "margin: 0 0 8px 0;",
+    "ul": "margin: 0 0 8px 18px; padding-left: 18px;",
+    "ol": "margin: 0 0 8px 18px; padding-left: 18px;",
+    "pre": (
+        "margin: 0 0 8px 0; padding: 8px; border-radius: 4px; "
+        "background-color: rgba(255, 255, 255, 0.35);"
+    ),
+    "blockquote": (
+        "margin: 0 0 8px 0; padding-left: 10px; "
+        "border-left: 3px solid rgba(79, 70, 229, 0.35);"
+    ),
+}
+_REASONING_BLOCK_TAG_RE = re.compile(r'<(p|ul|ol|pre|blockquote)([^>]*)>')
+
+
+def _inject_reasoning_block_style(match) -> str:
+    """_REASONING_BLOCK_TAG_RE.sub callback adding the block's style unless the tag already has one"""
+    tag = match.group(1)
+    attrs = match.group(2) or ""
+    if "style=" in attrs:
+        return match.group(0)
+    return f'<{tag}{attrs} style="{_REASONING_BLOCK_STYLES[tag]}">' \
+        if attrs else f'<{tag} style="{_REASONING_BLOCK_STYLES[tag]}">'
+
+
+_async_loop = None
+_async_loop_thread = None
+_async_loop_lock = threading.Lock()
+# How long unloading waits for the cancelled requests to unwind before leaving the loop thread behind
+_ASYNC_LOOP_STOP_TIMEOUT = 5
+
+
+def _get_async_loop():
+    """Return the event loop shared by all MLLM requests, starting its thread on first use"""
+    global _async_loop, _async_loop_thread
+    with _async_loop_lock:
+        if _async_loop is None:
+            _async_loop = asyncio.new_event_loop()
+            _async_loop_thread = threading.Thread(target=_async_loop.run_forever, name="LibreGeoLensMLLM", daemon=True)
+            _async_loop_thread.start()
+        return _async_loop
+
+
+async def _cancel_tasks_and_stop(loop):
+    """Cancel every other task on the loop, wait for them to unwind, then stop the loop"""
+    tasks = [task for task in asyncio.all_tasks(loop) if task is not asyncio.current_task(loop)]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    loop.stop()
+
+
+def stop_async_loop():
+    """Cancel the running MLLM requests and shut the shared event loop down, e.g. when the plugin is unloaded"""
+    global _async_loop, _async_loop_thread
+    with _async_loop_lock:
+        loop, thread = _async_loop, _async_loop_thread
+        _async_loop = _async_loop_thread = None
+    if loop is None:
+        return
+    asyncio.run_coroutine_threadsafe(_cancel_tasks_and_stop(loop), loop)
+    thread.join(_ASYNC_LOOP_STOP_TIMEOUT)
+    if thread.is_alive():
+        # A request ignored its cancellation, the daemon thread goes away with the process
+        logger.warning("The MLLM event loop did not stop in time, leaving it to exit with QGIS")
+        return
+    loop.run_until_complete(loop.shutdown_asyncgens())
+    loop.close()
+
+
 class MLLMStreamWorker(QObject):
     chunk_received = pyqtSignal(object, object)
     stream_failed = pyqtSignal(object)
@@ -53,6 +292,9 @@ class MLLMStreamWorker(QObject):
     failed = pyqtSignal(object)
     done = pyqtSignal()
 
+    # Streamed chunks are batched into at most one chunk_received per interval (seconds), ~50 Hz
+    CHUNK_FLUSH_INTERVAL = 0.02
+
     def __init__(self, model, messages, base_kwargs, stream_supported,
                  parse_stream_chunk, parse_completion_response, parent=None):
         super().__init__(parent)
@@ -62,109 +304,155 @@ class MLLMStreamWorker(QObject):
         self.stream_supported = stream_supported
         self.parse_stream_chunk = parse_stream_chunk
         self.parse_completion_response = parse_completion_response
-        self._cancel_requested = False
+        self._loop = None
+        self._task = None
+        # Only touched from the event loop thread
+        self._pending_text = []
+        self._pending_reasoning = []
+        self._flush_handle = None
+
+    def start(self):
+        """Run the request on the shared event loop; all signals are delivered queued to the GUI thread"""
+        self._loop = _get_async_loop()
+        self._loop.call_soon_threadsafe(self._create_task)
 
     @pyqtSlot()
     def request_cancel(self):
-        self._cancel_requested = True
+        # Scheduled after _create_task on the same loop, so the task always exists by then
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._cancel_task)
+
+    def _create_task(self):
+        self._task = self._loop.create_task(self._run())
+        self._task.add_done_callback(self._on_task_done)
+
+    def _cancel_task(self):
+        if self._task is not None:
+            self._task.cancel()
+
+    def _on_task_done(self, task):
+        # A task cancelled before its first step never entered _run, so it could not report itself
+        if task.cancelled():
+            self.completed.emit(self._cancelled_payload("", "", False, None))
+            self.done.emit()
+
+    def _queue_chunk(self, text_chunk, reasoning_chunk):
+        if text_chunk:
+            self._pending_text.append(text_chunk)
+        if reasoning_chunk:
+            self._pending_reasoning.append(reasoning_chunk)
+        if self._flush_handle is None:
+            self._flush_handle = self._loop.call_later(self.CHUNK_FLUSH_INTERVAL, self._flush_chunks)
+
+    def _flush_chunks(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        text_chunk = "".join(self._pending_text) or None
+        reasoning_chunk = "".join(self._pending_reasoning) or None
+        self._pending_text.clear()
+        self._pending_reasoning.clear()
+        if text_chunk or reasoning_chunk:
+            self.chunk_received.emit(text_chunk, reasoning_chunk)
+
+    @staticmethod
+    def _cancelled_payload(response_text, reasoning_text, stream_success, stream_error):
+        return {
+            "response_text": response_text or "",
+            "reasoning_text": reasoning_text or "",
+            "stream_success": stream_success,
+            "stream_error": stream_error,
+            "cancelled": True,
+        }
+
+    @staticmethod
+    async def _close_stream(response_stream):
+        aclose_fn = getattr(response_stream, "aclose", None)
+        close_fn = getattr(response_stream, "close", None) if aclose_fn is None else None
+        try:
+            if aclose_fn is not None:
+                await aclose_fn()
+            elif close_fn is not None:
+                close_fn()
+        except Exception:
+            pass
 
-    def run(self):
+    async def _run(self):
         response_text = ""
         reasoning_text = ""
         stream_success = False
         stream_error = None
         stream_error_traceback = None
-        cancelled = False
 
         try:
-            if self.stream_supported:
-                try:
-                    response_stream = litellm.completion(
-                        model=self.model,
-                        messages=self.messages,
-                        stream=True,
-                        **self.base_kwargs,
-                        # Tried allowed_openai_params to make reasoning work with OpenRouter but it doesn't
-                        # And it breaks reasoning with Anthropic if provided
-                        # allowed_openai_params=['reasoning_effort'] if 'reasoning_effort' in self.base_kwargs else []
-                    )
-                    if self._cancel_requested:
-                        cancelled = True
-                        if hasattr(response_stream, "close"):
-                            try:
-                                response_stream.close()
-                            except Exception:
-                                pass
-                    else:
-                        for chunk in response_stream:
-                            if self._cancel_requested:
-                                cancelled = True
-                                break
-                            text_chunk, reasoning_chunk = self.parse_stream_chunk(chunk)
-                            if text_chunk:
-                                response_text += text_chunk
-                            if reasoning_chunk:
-                                reasoning_text += reasoning_chunk
-                            if text_chunk or reasoning_chunk:
-                                self.chunk_received.emit(text_chunk, reasoning_chunk)
-                        if hasattr(response_stream, "close"):
-                            try:
-                                response_stream.close()
-                            except Exception:
-                                pass
-                    if not cancelled:
+            try:
+                if self.stream_supported:
+                    try:
+                        response_stream = await _litellm().acompletion(
+                            model=self.model,
+                            messages=self.messages,
+                            stream=True,
+                            **self.base_kwargs,
+                            # Tried allowed_openai_params to make reasoning work with OpenRouter but it doesn't
+                            # And it breaks reasoning with Anthropic if provided
+                            # allowed_openai_params=['reasoning_effort'] if 'reasoning_effort' in self.base_kwargs else []
+                        )
+                        try:
+                            async for chunk in response_stream:
+                                text_chunk, reasoning_chunk = self.parse_stream_chunk(chunk)
+                                if text_chunk:
+                                    response_text += text_chunk
+                                if reasoning_chunk:
+                                    reasoning_text += reasoning_chunk
+                                if text_chunk or reasoning_chunk:
+                                    self._queue_chunk(text_chunk, reasoning_chunk)
+                        finally:
+                            # Deliver what is still buffered before completed/failed
+                            self._flush_chunks()
+                            await self._close_stream(response_stream)
                         stream_success = True
-                except Exception as error:
-                    stream_error = error
-                    stream_error_traceback = traceback.format_exc()
-                    self.stream_failed.emit({
-                        "error": error,
-                        "traceback": stream_error_traceback,
-                    })
+                    except Exception as error:
+                        stream_error = error
+                        stream_error_traceback = traceback.format_exc()
+                        self.stream_failed.emit({
+                            "error": error,
+                            "traceback": stream_error_traceback,
+                        })
 
-            cancelled = cancelled or self._cancel_requested
+                if not stream_success:
+                    if stream_error is not None:
+                        self.failed.emit({
+                            "stream_error": stream_error,
+                            "traceback": stream_error_traceback,
+                        })
+                        return
+                    try:
+                        non_stream_response = await _litellm().acompletion(
+                            model=self.model,
+                            messages=self.messages,
+                            **self.base_kwargs,
+                        )
+                    except Exception as exc:
+                        error_payload = {
+                            "stream_error": stream_error,
+                            "final_error": exc,
+                            "traceback": traceback.format_exc(),
+                        }
+                        self.failed.emit(error_payload)
+                        return
+
+                    response_text, reasoning_text = self.parse_completion_response(non_stream_response)
 
-            if cancelled:
                 self.completed.emit({
                     "response_text": response_text or "",
                     "reasoning_text": reasoning_text or "",
                     "stream_success": stream_success,
                     "stream_error": stream_error,
-                    "cancelled": True,
+                    "cancelled": False,
                 })
-                return
-
-            if not stream_success:
-                if stream_error is not None:
-                    self.failed.emit({
-                        "stream_error": stream_error,
-                        "traceback": stream_error_traceback,
-                    })
-                    return
-                try:
-                    non_stream_response = litellm.completion(
-                        model=self.model,
-                        messages=self.messages,
-                        **self.base_kwargs,
-                    )
-                except Exception as exc:
-                    error_payload = {
-                        "stream_error": stream_error,
-                        "final_error": exc,
-                        "traceback": traceback.format_exc(),
-                    }
-                    self.failed.emit(error_payload)
-                    return
-
-                response_text, reasoning_text = self.parse_completion_response(non_stream_response)
-
-            self.completed.emit({
-                "response_text": response_text or "",
-                "reasoning_text": reasoning_text or "",
-                "stream_success": stream_success,
-                "stream_error": stream_error,
-                "cancelled": False,
-            })
+            except asyncio.CancelledError:
+                # Cancelled through request_cancel; report what was received so far instead of re-raising
+                self.completed.emit(self._cancelled_payload(response_text, reasoning_text, False, stream_error))
         except Exception as exc:
             self.failed.emit({
                 "unexpected_error": exc,
@@ -174,6 +462,19 @@ class MLLMStreamWorker(QObject):
             self.done.emit()
 
 
+class _ModelMeta:
+    """Per-item data of the models list in ManageServicesDialog"""
+    __slots__ = ("model", "removable", "base_tooltip")
+
+    def __init__(self, model, removable, base_tooltip):
+        self.model = model
+        self.removable = removable
+        self.base_tooltip = base_tooltip
+
+
+_NO_MODEL_META = _ModelMeta(None, False, None)
+
+
 class ManageServicesDialog(QDialog):
     def __init__(self, parent, service_templates, service_configurations, added_models,
                  default_service_names, deduplicate_fn):
@@ -182,30 +483,45 @@ class ManageServicesDialog(QDialog):
         self.setModal(True)
         self.resize(820, 560)
 
-        self.templates = copy.deepcopy(service_templates)
+        # All plain JSON data: the templates are JSON-style literals and the rest is persisted as JSON
+        self.templates = _fast_clone(service_templates)
         self.default_service_names = set(default_service_names)
-        self.working_configurations = copy.deepcopy(service_configurations or {})
-        self.working_added_models = copy.deepcopy(added_models or {})
+        self.working_configurations = _fast_clone(service_configurations or {})
+        self.working_added_models = _fast_clone(added_models or {})
         self.deduplicate_fn = deduplicate_fn
+        # Templates are not edited in the dialog, so their required env var names are computed once
+        self._required_envs_by_service = {
+            name: [env_info.get("name") for env_info in template.get("env_vars", []) if env_info.get("required", True)]
+            for name, template in self.templates.items()
+        }
+        # Same for the provider each template falls back to when no provider_name is configured
+        self._template_providers = {
+            name: template.get("litellm_params", {}).get("custom_llm_provider") or template.get("provider_name")
+            for name, template in self.templates.items()
+        }
+
+        # Rendered "KEY=VALUE" text of each service's env vars, dropped when they change
+        self._env_text_cache = {}
 
         self.working_reasoning_overrides = {}
-        all_service_names = set(self.working_configurations.keys()) | set(self.templates.keys())
-        for name in all_service_names:
+        for name in self.templates:
             self.working_configurations.setdefault(name, {})
-            self.working_added_models.setdefault(name, [])
-            config = self.working_configurations[name]
+        for name, config in self.working_configurations.items():
+            # Deduplicated once here; add_model and remove_selected_model keep the lists duplicate-free
+            self.working_added_models[name] = deduplicate_fn(self.working_added_models.get(name, []))
             overrides = config.get("reasoning_overrides")
             if isinstance(overrides, dict):
                 cleaned = {
                     str(model): state
                     for model, state in overrides.items()
-                    if state in ("force_on", "force_off")
+                    if state in _REASONING_OVERRIDE_STATES
                 }
             else:
                 cleaned = {}
             self.working_reasoning_overrides[name] = cleaned
             if cleaned:
-                config["reasoning_overrides"] = cleaned.copy()
+                # Shared on purpose: persist_current_service rebuilds the config's copy before it is used
+                config["reasoning_overrides"] = cleaned
             else:
                 config.pop("reasoning_overrides", None)
 
@@ -215,6 +531,10 @@ class ManageServicesDialog(QDialog):
         self.result_configurations = None
         self.result_added_models = None
         self.env_var_validation_issues = {}
+        # Set when the user edits the detail form, so browsing services does not re-persist untouched forms
+        self._detail_dirty = False
+        # Names shown in models_list, kept in sync by populate_models_list for O(1) duplicate checks
+        self._current_model_names = set()
 
         main_layout = QVBoxLayout(self)
         content_layout = QHBoxLayout()
@@ -222,6 +542,7 @@ class ManageServicesDialog(QDialog):
 
         list_panel = QVBoxLayout()
         self.service_list = QListWidget()
+        self._item_by_name = {}
         self.service_list.currentItemChanged.connect(self.on_service_changed)
         list_panel.addWidget(self.service_list)
 
@@ -294,6 +615,9 @@ class ManageServicesDialog(QDialog):
         env_label = QLabel("Extra Env Vars:")
         env_label.setToolTip("One per line in KEY=VALUE format; values override existing environment variables")
         self.env_vars_input = QPlainTextEdit()
+        # One KEY=VALUE per line: no wrapping to lay out, and a cap so huge pastes cannot stall every keystroke
+        self.env_vars_input.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.env_vars_input.setMaximumBlockCount(500)
         detail_form.addRow(env_label, self.env_vars_input)
 
         detail_panel.addSpacing(12)
@@ -346,23 +670,38 @@ class ManageServicesDialog(QDialog):
         button_box.rejected.connect(self.reject)
         main_layout.addWidget(button_box)
 
+        for signal in (self.provider_input.textEdited, self.api_key_input.textEdited,
+                       self.api_base_input.textEdited, self.streaming_checkbox.toggled,
+                       self.limit_mode_combo.currentIndexChanged, self.image_mb_spin.valueChanged,
+                       self.longest_px_spin.valueChanged, self.shortest_px_spin.valueChanged,
+                       self.env_vars_input.textChanged):
+            signal.connect(self._mark_detail_dirty)
+
         self.on_limit_mode_changed()
         self.update_service_list()
 
     # -----------------
 
     def update_service_list(self, select_name=None):
-        names = set(self.templates.keys()) | set(self.working_configurations.keys())
-        ordered_names = sorted(names, key=lambda value: value.lower())
+        ordered_names = sorted(dict.fromkeys([*self.templates, *self.working_configurations]), key=str.lower)
 
         previous_service = self.current_service
+        env_snapshot = dict(os.environ)
         self.service_list.blockSignals(True)
-        self.service_list.clear()
-        for name in ordered_names:
-            status_text = "Configured" if self._is_service_configured(name) else "Missing credentials"
+        # Only touch the rows whose service was added or removed, the list is kept in sorted order
+        for name in set(self._item_by_name).difference(ordered_names):
+            row = self.service_list.row(self._item_by_name.pop(name))
+            if row == self.service_list.currentRow():
+                self.service_list.setCurrentRow(-1)
+            self.service_list.takeItem(row)
+        for row, name in enumerate(ordered_names):
+            if name in self._item_by_name:
+                continue
+            status_text = "Configured" if self._is_service_configured(name, env_snapshot) else "Missing credentials"
             item = QListWidgetItem(f"{name} ({status_text})")
             item.setData(Qt.UserRole, name)
-            self.service_list.addItem(item)
+            self.service_list.insertItem(row, item)
+            self._item_by_name[name] = item
         self.service_list.blockSignals(False)
 
         if select_name and select_name in ordered_names:
@@ -375,44 +714,42 @@ class ManageServicesDialog(QDialog):
             target_name = None
 
         if target_name:
-            for index in range(self.service_list.count()):
-                item = self.service_list.item(index)
-                if item.data(Qt.UserRole) == target_name:
-                    self.service_list.setCurrentRow(index)
-                    return
+            self.service_list.setCurrentItem(self._item_by_name[target_name])
+            return
 
         self.service_list.setCurrentRow(-1)
         self.current_service = None
         self._set_detail_widgets_enabled(False)
 
     def refresh_status_labels(self):
-        for index in range(self.service_list.count()):
-            item = self.service_list.item(index)
-            name = item.data(Qt.UserRole)
-            status_text = "Configured" if self._is_service_configured(name) else "Missing credentials"
+        env_snapshot = dict(os.environ)
+        for name, item in self._item_by_name.items():
+            status_text = "Configured" if self._is_service_configured(name, env_snapshot) else "Missing credentials"
             item.setText(f"{name} ({status_text})")
 
-    def _is_service_configured(self, service_name):
+    def _is_service_configured(self, service_name, env_snapshot):
         config = self.working_configurations.get(service_name, {})
         api_key = config.get("api_key")
         env_pairs = config.get("env_vars") or {}
         if api_key:
             return True
 
-        template = self.templates.get(service_name, {})
-        required_envs = [env_info for env_info in template.get("env_vars", []) if env_info.get("required", True)]
+        required_envs = self._required_envs_by_service.get(service_name)
         if required_envs:
-            for env_info in required_envs:
-                env_name = env_info.get("name")
+            for env_name in required_envs:
                 if not env_name:
                     continue
-                if env_pairs.get(env_name) or os.getenv(env_name):
+                if env_pairs.get(env_name) or env_snapshot.get(env_name):
                     continue
                 return False
             return True
 
         return bool(env_pairs)
 
+    def _mark_detail_dirty(self, *_):
+        self._detail_dirty = True
+
+    @pyqtSlot(QListWidgetItem, QListWidgetItem)
     def on_service_changed(self, current_item, previous_item):
         if previous_item is not None and self.current_service is not None:
             self.persist_current_service()
@@ -439,18 +776,17 @@ class ManageServicesDialog(QDialog):
             self.reasoning_override_warning.setVisible(False)
         self._sync_reasoning_override_ui()
 
+    def _resolve_provider(self, service_name):
+        config = self.working_configurations.get(service_name, {})
+        return config.get("provider_name") or self._template_providers.get(service_name)
+
     def populate_service_form(self, service_name):
         template = self.templates.get(service_name, {})
         config = self.working_configurations.get(service_name, {})
 
         self.display_name_input.setText(service_name)
 
-        provider = config.get("provider_name")
-        if not provider:
-            provider = template.get("litellm_params", {}).get("custom_llm_provider")
-        if not provider:
-            provider = template.get("provider_name")
-        self.provider_input.setText(provider or "")
+        self.provider_input.setText(self._resolve_provider(service_name) or "")
 
         self.api_key_input.setText(config.get("api_key", ""))
         self.api_base_input.setText(config.get("api_base", ""))
@@ -460,14 +796,18 @@ class ManageServicesDialog(QDialog):
         limits = config.get("limits") if config.get("limits") else template.get("limits", {})
         self._apply_limits_to_widgets(limits)
 
-        env_pairs = config.get("env_vars") or {}
-        env_text = "\n".join(f"{key}={value}" for key, value in env_pairs.items())
+        env_text = self._env_text_cache.get(service_name)
+        if env_text is None:
+            env_pairs = config.get("env_vars") or {}
+            env_text = "\n".join([f"{key}={value}" for key, value in env_pairs.items()])
+            self._env_text_cache[service_name] = env_text
         self.env_vars_input.setPlainText(env_text)
 
         self.remove_service_button.setEnabled(service_name not in self.default_service_names)
         self.populate_models_list(service_name)
         self.update_model_buttons()
         self.refresh_status_labels()
+        self._detail_dirty = False
 
     def _apply_limits_to_widgets(self, limits):
         if not limits:
@@ -494,6 +834,7 @@ class ManageServicesDialog(QDialog):
             self.shortest_px_spin.setValue(0)
         self.on_limit_mode_changed()
 
+    @pyqtSlot()
     def on_limit_mode_changed(self):
         mode = self.limit_mode_combo.currentData()
         self.image_mb_spin.setEnabled(mode == "image_mb")
@@ -506,39 +847,30 @@ class ManageServicesDialog(QDialog):
         base_models = template.get("models", [])
         user_models = self.working_added_models.get(service_name, [])
 
-        for model in base_models:
-            item = QListWidgetItem(model)
-            base_tooltip = "Preset model from the plugin configuration"
-            item.setData(Qt.UserRole, {
-                "model": model,
-                "removable": False,
-                "base_tooltip": base_tooltip,
-            })
-            self._apply_reasoning_tooltip(item, service_name)
-            self.models_list.addItem(item)
-
-        for model in user_models:
-            item = QListWidgetItem(model)
-            base_tooltip = "User-added model"
-            item.setData(Qt.UserRole, {
-                "model": model,
-                "removable": True,
-                "base_tooltip": base_tooltip,
-            })
-            self._apply_reasoning_tooltip(item, service_name)
-            self.models_list.addItem(item)
+        entries = [(model, False, "Preset model from the plugin configuration") for model in base_models]
+        entries.extend((model, True, "User-added model") for model in user_models)
+        self._current_model_names = {model for model, _, _ in entries}
+
+        # Bulk-insert the labels in one row insertion, then decorate the created items
+        with QSignalBlocker(self.models_list):
+            self.models_list.addItems([model for model, _, _ in entries])
+            for row, (model, removable, base_tooltip) in enumerate(entries):
+                item = self.models_list.item(row)
+                item.setData(Qt.UserRole, _ModelMeta(model, removable, base_tooltip))
+                self._apply_reasoning_tooltip(item, service_name)
 
         if service_name == self.current_service:
             self._sync_reasoning_override_ui()
 
+    @pyqtSlot()
     def update_model_buttons(self):
         item = self.models_list.currentItem()
         if item is None:
             self.remove_model_button.setEnabled(False)
             self._sync_reasoning_override_ui()
             return
-        data = item.data(Qt.UserRole) or {}
-        self.remove_model_button.setEnabled(bool(data.get("removable")))
+        data = item.data(Qt.UserRole) or _NO_MODEL_META
+        self.remove_model_button.setEnabled(bool(data.removable))
         self._sync_reasoning_override_ui()
 
     @staticmethod
@@ -552,11 +884,11 @@ class ManageServicesDialog(QDialog):
     def _apply_reasoning_tooltip(self, item, service_name):
         if item is None:
             return
-        data = item.data(Qt.UserRole) or {}
-        base_tooltip = data.get("base_tooltip")
+        data = item.data(Qt.UserRole) or _NO_MODEL_META
+        base_tooltip = data.base_tooltip
         if not base_tooltip:
             base_tooltip = item.toolTip()
-        model_name = data.get("model")
+        model_name = data.model
         overrides = self.working_reasoning_overrides.get(service_name, {}) if service_name else {}
         description = self._describe_reasoning_override(overrides.get(model_name))
         if description:
@@ -580,11 +912,11 @@ class ManageServicesDialog(QDialog):
             return
 
         item = self.models_list.currentItem()
-        data = item.data(Qt.UserRole) or {}
-        model_name = data.get("model")
+        data = item.data(Qt.UserRole) or _NO_MODEL_META
+        model_name = data.model
         overrides = self.working_reasoning_overrides.get(self.current_service, {})
         state = overrides.get(model_name, "auto")
-        if state not in ("force_on", "force_off"):
+        if state not in _REASONING_OVERRIDE_STATES:
             state = "auto"
 
         self._syncing_reasoning_override_ui = True
@@ -614,14 +946,15 @@ class ManageServicesDialog(QDialog):
             return
         self.reasoning_override_warning.setVisible(False)
 
+    @pyqtSlot()
     def on_reasoning_override_changed(self):
         if self._syncing_reasoning_override_ui or not self.current_service:
             return
         item = self.models_list.currentItem()
         if item is None:
             return
-        data = item.data(Qt.UserRole) or {}
-        model_name = data.get("model")
+        data = item.data(Qt.UserRole) or _NO_MODEL_META
+        model_name = data.model
         if not model_name:
             return
 
@@ -631,10 +964,12 @@ class ManageServicesDialog(QDialog):
             overrides.pop(model_name, None)
         else:
             overrides[model_name] = state
+        self._detail_dirty = True
 
         self._apply_reasoning_tooltip(item, self.current_service)
         self._update_reasoning_override_warning(state)
 
+    @pyqtSlot()
     def add_service(self):
         if self.current_service is not None:
             self.persist_current_service()
@@ -660,6 +995,7 @@ class ManageServicesDialog(QDialog):
         self.working_reasoning_overrides[name] = {}
         self.update_service_list(select_name=name)
 
+    @pyqtSlot()
     def remove_service(self):
         item = self.service_list.currentItem()
         if not item:
@@ -683,31 +1019,27 @@ class ManageServicesDialog(QDialog):
         self.working_added_models.pop(service_name, None)
         self.env_var_validation_issues.pop(service_name, None)
         self.working_reasoning_overrides.pop(service_name, None)
+        self._env_text_cache.pop(service_name, None)
         self.current_service = None
         self._set_detail_widgets_enabled(False)
         self.update_service_list()
 
+    @pyqtSlot()
     def add_model(self):
-        if not self.current_service:
+        service_name = self.current_service
+        if not service_name:
             return
         model_name, ok = QInputDialog.getText(self, "Add Model", "Enter the full model identifier:")
         if not ok or not model_name.strip():
             return
         model_name = model_name.strip()
 
-        existing_models = [self.models_list.item(index).text() for index in range(self.models_list.count())]
-        if model_name in existing_models:
+        if model_name in self._current_model_names:
             QMessageBox.information(self, "Model Exists", "That model is already listed for this provider.")
             return
 
-        vision_check_failed = False
-        vision_check_error = ""
-        try:
-            supports_vision = litellm.supports_vision(model=model_name)
-        except Exception as exc:
-            supports_vision = None
-            vision_check_failed = True
-            vision_check_error = str(exc).strip()
+        supports_vision, vision_check_error = _litellm_supports_vision(model_name)
+        vision_check_failed = vision_check_error is not None
 
         if supports_vision is False:
             warning_text = (
@@ -740,41 +1072,45 @@ class ManageServicesDialog(QDialog):
             if reply != QMessageBox.Yes:
                 return
 
-        models = self.working_added_models.setdefault(self.current_service, [])
-        models.append(model_name)
-        self.working_added_models[self.current_service] = self.deduplicate_fn(models)
-        self.working_reasoning_overrides.setdefault(self.current_service, {}).pop(model_name, None)
-        self.populate_models_list(self.current_service)
+        # Not in _current_model_names, so appending cannot introduce a duplicate
+        self.working_added_models.setdefault(service_name, []).append(model_name)
+        overrides = self.working_reasoning_overrides.get(service_name)
+        if overrides:
+            overrides.pop(model_name, None)
+        self.populate_models_list(service_name)
         self.refresh_status_labels()
 
+    @pyqtSlot()
     def remove_selected_model(self):
         item = self.models_list.currentItem()
         if item is None:
             return
-        data = item.data(Qt.UserRole) or {}
-        if not data.get("removable"):
+        data = item.data(Qt.UserRole) or _NO_MODEL_META
+        if not data.removable:
             QMessageBox.information(self, "Cannot Remove", "Preset models cannot be removed.")
             return
-        model_name = data.get("model")
-        models = self.working_added_models.get(self.current_service, [])
+        model_name = data.model
+        service_name = self.current_service
+        models = self.working_added_models.get(service_name, [])
         if model_name in models:
             models.remove(model_name)
-            self.working_added_models[self.current_service] = self.deduplicate_fn(models)
-            self.working_reasoning_overrides.setdefault(self.current_service, {}).pop(model_name, None)
-            self.populate_models_list(self.current_service)
+            overrides = self.working_reasoning_overrides.get(service_name)
+            if overrides:
+                overrides.pop(model_name, None)
+            self.populate_models_list(service_name)
 
     def persist_current_service(self):
-        if not self.current_service:
+        # Nothing to write back when the form still shows what populate_service_form loaded
+        service_name = self.current_service
+        if not service_name or not self._detail_dirty:
             return
-        config = self.working_configurations.setdefault(self.current_service, {})
-        template = self.templates.get(self.current_service, {})
+        config = self.working_configurations.setdefault(service_name, {})
+        template = self.templates.get(service_name, {})
 
         provider_name = self.provider_input.text().strip()
-        template_provider = template.get("litellm_params", {}).get("custom_llm_provider")
-        if not template_provider:
-            template_provider = template.get("provider_name")
+        template_provider = self._template_providers.get(service_name)
 
-        if self.current_service in self.default_service_names:
+        if service_name in self.default_service_names:
             if provider_name and provider_name != (template_provider or ""):
                 config["provider_name"] = provider_name
             else:
@@ -799,7 +1135,7 @@ class ManageServicesDialog(QDialog):
 
         supports_streaming = self.streaming_checkbox.isChecked()
         template_streaming = template.get("supports_streaming", True)
-        if self.current_service in self.default_service_names:
+        if service_name in self.default_service_names:
             if supports_streaming != template_streaming:
                 config["supports_streaming"] = supports_streaming
             else:
@@ -818,28 +1154,31 @@ class ManageServicesDialog(QDialog):
             config.pop("limits", None)
 
         env_vars, invalid_lines = self._collect_env_vars()
+        if env_vars != (config.get("env_vars") or {}):
+            self._env_text_cache.pop(service_name, None)
         if env_vars:
             config["env_vars"] = env_vars
         else:
             config.pop("env_vars", None)
 
-        overrides = self.working_reasoning_overrides.get(self.current_service, {})
+        overrides = self.working_reasoning_overrides.get(service_name, {})
         valid_overrides = {
             model: state
             for model, state in overrides.items()
-            if state in ("force_on", "force_off")
+            if state in _REASONING_OVERRIDE_STATES
         }
-        self.working_reasoning_overrides[self.current_service] = valid_overrides.copy()
+        self.working_reasoning_overrides[service_name] = valid_overrides.copy()
         if valid_overrides:
             config["reasoning_overrides"] = valid_overrides
         else:
             config.pop("reasoning_overrides", None)
 
         if invalid_lines:
-            self.env_var_validation_issues[self.current_service] = invalid_lines
+            self.env_var_validation_issues[service_name] = invalid_lines
         else:
-            self.env_var_validation_issues.pop(self.current_service, None)
+            self.env_var_validation_issues.pop(service_name, None)
 
+        self._detail_dirty = False
         self.refresh_status_labels()
 
     def _collect_limits(self):
@@ -868,18 +1207,16 @@ class ManageServicesDialog(QDialog):
             line = raw_line.strip()
             if not line:
                 continue
-            if "=" not in line:
-                invalid_lines.append(raw_line)
-                continue
-            key, value = line.split("=", 1)
-            key = key.strip()
-            value = value.strip()
-            if not key:
+            # str.partition scans the line once, no need for a separate "=" check or a regex
+            key, sep, value = line.partition("=")
+            key = key.rstrip()
+            if not sep or not key:
                 invalid_lines.append(raw_line)
                 continue
-            env_pairs[key] = value
+            env_pairs[key] = value.lstrip()
         return env_pairs, invalid_lines
 
+    @pyqtSlot()
     def handle_accept(self):
         self.persist_current_service()
 
@@ -895,17 +1232,10 @@ class ManageServicesDialog(QDialog):
             )
             return
 
-        missing_providers = []
-        for name in set(self.templates.keys()) | set(self.working_configurations.keys()):
-            config = self.working_configurations.get(name, {})
-            provider = config.get("provider_name")
-            if not provider:
-                template = self.templates.get(name, {})
-                provider = template.get("litellm_params", {}).get("custom_llm_provider")
-                if not provider:
-                    provider = template.get("provider_name")
-            if not provider:
-                missing_providers.append(name)
+        missing_providers = [
+            name for name in dict.fromkeys([*self.templates, *self.working_configurations])
+            if not self._resolve_provider(name)
+        ]
 
         if missing_providers:
             QMessageBox.warning(
@@ -936,16 +1266,22 @@ class LibreGeoLensDockWidget(QDockWidget):
         self.current_chat_id = None
         self.conversation = []
         self.rendered_interactions = []
+        self._chat_history_html = None  # last HTML given to chat_history.setHtml
         self.active_streams = {}
         self.help_dialog = None
         self.info_dialog = None
+        self._chip_info_html_cache = (None, None)  # (supported_api_clients it was built from, html)
 
-        settings = QSettings("Ampsight", "LibreGeoLens")
+        # Opened once and reused by every method that reads or writes the plugin settings
+        self._settings = QSettings("Ampsight", "LibreGeoLens")
+        self._saved_settings_payloads = {}  # Last JSON written per settings key, see _save_settings_json
+        settings = self._settings
 
+        _configure_gdal_for_cogs()
         self.tracked_layers = []
-        self.tracked_layers_names = []
+        self.tracked_layers_names = set()  # Only used for membership tests
         self.geojson_path = settings.value("geojson_path", None, type=str)
-        self.cogs_dict = json.loads(settings.value("cogs_dict", "{}"))
+        self._cogs_dict = None  # Parsed from QSettings on first use, see the cogs_dict property
         self.geojson_layer = None
         if self.geojson_path is not None and os.path.exists(self.geojson_path):
             self.handle_imagery_layers()
@@ -961,21 +1297,14 @@ class LibreGeoLensDockWidget(QDockWidget):
         self.current_highlighted_button = None
         self.area_drawing_tool = None
         self.identify_drawn_area_tool = None
+        self._capture_job = None  # Map render job of the drawn area still being captured, one at a time
 
         self.log_layer = self.create_log_layer()
+        self._chip_id_to_fid = None  # ChipId -> log layer feature id, see _find_log_feature
         QgsProject.instance().addMapLayer(self.log_layer)
         self.style_geojson_layer(self.log_layer, color=(254, 178, 76))
         # There might be previous temp features (drawings)
-        features_to_remove = [
-            feature.id() for feature in self.log_layer.getFeatures()
-            if str(feature["ImagePath"]) == "NULL"
-        ]
-        if features_to_remove:
-            self.log_layer.startEditing()
-            self.log_layer.dataProvider().deleteFeatures(features_to_remove)
-            self.log_layer.commitChanges()
-        self.log_layer.updateExtents()
-        self.log_layer.triggerRepaint()
+        self._purge_null_image_features()
 
         # ----------------
         # ----------------
@@ -1128,22 +1457,7 @@ class LibreGeoLensDockWidget(QDockWidget):
         main_content_layout.addWidget(self.image_display_widget, stretch=2)
 
         self.send_to_mllm_button = QPushButton("Send to MLLM")
-        button_style_template = (
-            "QPushButton {{"
-            "padding: 10px; font-weight: 600;"
-            "background-color: {enabled_color}; color: white;"
-            "}}"
-            "QPushButton:hover {{ background-color: {enabled_color}; }}"
-            "QPushButton:pressed {{ background-color: {pressed_color}; }}"
-            "QPushButton:disabled {{ background-color: {disabled_color}; color: #F2F2F2; }}"
-        )
-        self.send_to_mllm_button.setStyleSheet(
-            button_style_template.format(
-                enabled_color="#2E7D32",
-                pressed_color="#2E7D32",
-                disabled_color="#A5D6A7",
-            )
-        )
+        self.send_to_mllm_button.setStyleSheet(_SEND_BUTTON_QSS)
         self.send_to_mllm_button.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
         self.send_to_mllm_button.setMinimumHeight(42)
         self.send_to_mllm_button.clicked.connect(self.send_to_mllm_fn)
@@ -1157,13 +1471,7 @@ class LibreGeoLensDockWidget(QDockWidget):
         self.cancel_mllm_button.setEnabled(False)
         self.cancel_mllm_button.setToolTip("Cancel the current Send to MLLM request")
         self.cancel_mllm_button.clicked.connect(self.cancel_active_mllm_request)
-        self.cancel_mllm_button.setStyleSheet(
-            button_style_template.format(
-                enabled_color="#C62828",
-                pressed_color="#C62828",
-                disabled_color="#EF9A9A",
-            )
-        )
+        self.cancel_mllm_button.setStyleSheet(_CANCEL_BUTTON_QSS)
         self.cancel_mllm_button.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
         self.cancel_mllm_button.setMinimumHeight(42)
         send_button_row.addWidget(self.cancel_mllm_button, stretch=1)
@@ -1315,28 +1623,22 @@ class LibreGeoLensDockWidget(QDockWidget):
 
         # ----------------
 
-        settings = QSettings()
-        self.qgis_theme = settings.value("UI/UITheme")
-        is_dark_mode = QApplication.palette().color(QPalette.Window).value() < 128
-        if self.qgis_theme in ["Night Mapping", "Blend of Gray"] or (self.qgis_theme == "default" and is_dark_mode):
-            chat_history_styles = """
-            background-color: #2b2b2b;
-            color: #ffffff;
-            border: 1px solid #555;
-            """
+        self.qgis_theme = QSettings().value("UI/UITheme")
+        # The palette is only inspected for the default theme, the other dark themes are known by name
+        if self.qgis_theme in _DARK_QGIS_THEMES or (
+                self.qgis_theme == "default" and QApplication.palette().color(QPalette.Window).value() < 128):
             self.text_color = "white"
-            image_display_styles = """
-            background-color: #2b2b2b;
-            """
-            self.chat_history.setStyleSheet(chat_history_styles)
-            self.image_display_widget.setStyleSheet(image_display_styles)
+            self.chat_history.setStyleSheet(_DARK_CHAT_HISTORY_STYLE)
+            self.image_display_widget.setStyleSheet(_DARK_IMAGE_DISPLAY_STYLE)
             if os.name == "posix":
-                if "darwin" == os.uname().sysname.lower():  # macOS
+                if _IS_MACOS:
                     QApplication.instance().setStyleSheet("""QInputDialog, QComboBox, QPushButton, QLabel {color: #D3D3D3;}""")
                 else:  # Linux
                     QApplication.instance().setStyleSheet("""QInputDialog, QComboBox, QPushButton, QLabel {color: #2b2b2b;}""")
         else:
             self.text_color = "black"
+        self._chip_html_template = _CHIP_HTML_TEMPLATE % {"color": self.text_color}
+        self._chip_resolution_template = _CHIP_RESOLUTION_TEMPLATE % {"color": self.text_color}
 
         # ----------------
 
@@ -1379,16 +1681,17 @@ class LibreGeoLensDockWidget(QDockWidget):
             self.canvas.unsetMapTool(self.identify_drawn_area_tool)
             self.identify_drawn_area_tool = None
 
-        features_to_remove = [
-            feature.id() for feature in self.log_layer.getFeatures()
-            if str(feature["ImagePath"]) == "NULL"
-        ]
-        if features_to_remove:
-            self.log_layer.startEditing()
-            self.log_layer.dataProvider().deleteFeatures(features_to_remove)
-            self.log_layer.commitChanges()
-        self.log_layer.updateExtents()
-        self.log_layer.triggerRepaint()
+        # Drop a capture still rendering, its chip would otherwise be added after the temp features are purged
+        if self._capture_job is not None:
+            self._capture_job.finished.disconnect()
+            self._capture_job.cancel()  # Blocks until the render threads are done, before the job is released
+            self._capture_job = None
+            self._set_draw_area_enabled(True)
+
+        # Requests still streaming would otherwise keep updating the chat of a closed dock
+        self.cancel_mllm_workers()
+
+        self._purge_null_image_features()
 
         if self.current_highlighted_button:
             self.current_highlighted_button.setStyleSheet("")
@@ -1415,13 +1718,14 @@ class LibreGeoLensDockWidget(QDockWidget):
         if layers:
             self.geojson_layer = layers[0]
             self.tracked_layers.append(self.geojson_layer.id())
-            self.tracked_layers_names.append("geojson_layer")
+            self.tracked_layers_names.add("geojson_layer")
         else:
             self.geojson_layer = QgsVectorLayer(self.geojson_path, "Imagery Polygons", "ogr")
+            self.create_spatial_index(self.geojson_layer)
             QgsProject.instance().addMapLayer(self.geojson_layer)
             self.style_geojson_layer(self.geojson_layer)
             self.tracked_layers.append(self.geojson_layer.id())
-            self.tracked_layers_names.append("geojson_layer")
+            self.tracked_layers_names.add("geojson_layer")
 
         root = QgsProject.instance().layerTreeRoot()
         for node in root.children():
@@ -1429,7 +1733,15 @@ class LibreGeoLensDockWidget(QDockWidget):
                 layer = node.layer()
                 if layer and layer.id() in self.cogs_dict:
                     self.tracked_layers.append(layer.id())
-                    self.tracked_layers_names.append(self.cogs_dict[layer.id()])
+                    self.tracked_layers_names.add(self.cogs_dict[layer.id()])
+
+    @property
+    def cogs_dict(self):
+        """Maps the layer ids of the loaded COGs to their remote paths, kept in sync with QSettings on save"""
+        if self._cogs_dict is None:
+            settings = self._settings
+            self._cogs_dict = _settings_loads(settings.value("cogs_dict", "{}", type=str) or "{}")
+        return self._cogs_dict
 
     def adjust_size_to_available_space(self):
         """ Adjust the docked widget size to fit within the QGIS interface. """
@@ -1479,6 +1791,7 @@ class LibreGeoLensDockWidget(QDockWidget):
         project.removeMapLayer(self.log_layer.id())
         del self.log_layer
         self.log_layer = self.create_log_layer()
+        self._chip_id_to_fid = None
         QgsProject.instance().addMapLayer(self.log_layer)
         self.style_geojson_layer(self.log_layer, color=(254, 178, 76))
         if self.identify_drawn_area_tool is not None:
@@ -1486,11 +1799,12 @@ class LibreGeoLensDockWidget(QDockWidget):
         self.image_display_widget.log_layer = self.log_layer
 
     def handle_anchor_click(self, url):
-        url_str = url.toString() if type(url) != str else url
-        if self._has_active_stream() and not url_str.startswith("toggle://reasoning/"):
+        url_str = url if isinstance(url, str) else url.toString()
+        is_reasoning_toggle = url_str.startswith("toggle://reasoning/")
+        if self._has_active_stream() and not is_reasoning_toggle:
             return
-        if url_str.startswith("toggle://reasoning/"):
-            toggle_id = url_str.split("toggle://reasoning/", 1)[1]
+        if is_reasoning_toggle:
+            toggle_id = url_str[len("toggle://reasoning/"):]
             for entry in self.rendered_interactions:
                 if entry.get("display_id") == toggle_id:
                     entry["reasoning_visible"] = not entry.get("reasoning_visible", False)
@@ -1503,40 +1817,59 @@ class LibreGeoLensDockWidget(QDockWidget):
                 image_path = image_path.replace("/", "\\\\").replace("c\\", "C:\\")
             chip_id = ntpath.basename(image_path).split(".")[0].split("_screen")[0]
 
-            # Check if image is already in display widget (use dict comprehension for efficiency)
-            existing_images = {img["chip_id"]: idx for idx, img in enumerate(self.image_display_widget.images) 
-                               if "chip_id" in img and img["chip_id"] is not None}
-            
-            if chip_id not in existing_images:
+            # Check if image is already in display widget
+            displayed_chip_ids = {img["chip_id"] for img in self.image_display_widget.images
+                                  if img.get("chip_id") is not None}
+
+            if chip_id not in displayed_chip_ids:
                 # Add image to display widget
                 self.image_display_widget.add_image(image_path)
                 self.image_display_widget.images[-1]["chip_id"] = chip_id
                 
-                # Get chip geometry data using more efficient query
-                chip = self.logs_db.fetch_chip_by_id(chip_id)
-                if chip:
-                    geocoords = json.loads(chip[2])
-                    # Calculate bounds in one pass instead of multiple list comprehensions
-                    min_x = min_y = float('inf')
-                    max_x = max_y = float('-inf')
-                    for lon, lat in geocoords:
-                        min_x = min(min_x, lon)
-                        max_x = max(max_x, lon)
-                        min_y = min(min_y, lat)
-                        max_y = max(max_y, lat)
-                    
-                    rectangle = QgsRectangle(min_x, min_y, max_x, max_y)
+                # The chip's bounding box is stored alongside its geocoords
+                bounds = self.logs_db.fetch_chip_bounds(chip_id)
+                if bounds and None not in bounds:
+                    rectangle = QgsRectangle(*bounds)
                     self.image_display_widget.images[-1]["rectangle_geom"] = QgsGeometry.fromRect(rectangle)
 
-            # Use more efficient feature lookup
-            request = QgsFeatureRequest().setFilterExpression(f'"ChipId" = \'{chip_id}\'')
-            first_feature = next(self.log_layer.getFeatures(request), None)
-            
+            first_feature = self._find_log_feature(chip_id)
+
             if first_feature:
                 zoom_to_and_flash_feature(first_feature, self.canvas, self.log_layer)
             else:
                 QMessageBox.warning(None, "Feature Not Found", "No feature found for the clicked chip.")
 
+    def _find_log_feature(self, chip_id):
+        """Return the log layer feature of a chip, fetched directly by its feature id once that is known"""
+        if self._chip_id_to_fid is None:
+            # Built on first use with a single id + ChipId pass over the layer
+            request = (QgsFeatureRequest()
+                       .setFlags(QgsFeatureRequest.NoGeometry)
+                       .setSubsetOfAttributes(["ChipId"], self.log_layer.fields()))
+            self._chip_id_to_fid = {}
+            for feature in self.log_layer.getFeatures(request):
+                self._chip_id_to_fid.setdefault(str(feature["ChipId"]), feature.id())
+
+        # Callers only zoom to the geometry, ChipId is all that is read from the attributes
+        fields = self.log_layer.fields()
+        fid = self._chip_id_to_fid.get(chip_id)
+        if fid is not None:
+            request = QgsFeatureRequest().setFilterFid(fid).setSubsetOfAttributes(["ChipId"], fields)
+            feature = next(self.log_layer.getFeatures(request), None)
+            if feature is not None and str(feature["ChipId"]) == chip_id:
+                return feature
+
+        # Not indexed yet or the feature was deleted/replaced since, look it up by attribute
+        request = (QgsFeatureRequest()
+                   .setFilterExpression(QgsExpression.createFieldEqualityExpression("ChipId", chip_id))
+                   .setSubsetOfAttributes(["ChipId"], fields))
+        feature = next(self.log_layer.getFeatures(request), None)
+        if feature is not None:
+            self._chip_id_to_fid[chip_id] = feature.id()
+        else:
+            self._chip_id_to_fid.pop(chip_id, None)
+        return feature
+
     def load_chat_list(self):
         self.chat_list.clear()
         chats = self.logs_db.fetch_all_chats()
@@ -1576,9 +1909,18 @@ class LibreGeoLensDockWidget(QDockWidget):
             return
 
         interactions_sequence = json.loads(chat_record[1])
+        interactions_by_id = self.logs_db.fetch_interactions_by_ids(interactions_sequence)
+        interactions = [interactions_by_id.get(interaction_id) for interaction_id in interactions_sequence]
 
-        for interaction_id in interactions_sequence:
-            interaction = self.logs_db.fetch_interaction_by_id(interaction_id)
+        # Every chip of the chat in one batched query instead of one query per chip
+        chip_ids_by_interaction = {
+            interaction[0]: json.loads(interaction[3]) for interaction in interactions if interaction
+        }
+        chips_by_id = self.logs_db.fetch_chips_by_ids(
+            chip_id for chip_ids_list in chip_ids_by_interaction.values() for chip_id in chip_ids_list
+        )
+
+        for interaction_id, interaction in zip(interactions_sequence, interactions):
             if not interaction:
                 continue
 
@@ -1605,16 +1947,18 @@ class LibreGeoLensDockWidget(QDockWidget):
 
             self.conversation.append({"role": "user", "content": [{"type": "text", "text": prompt}]})
 
-            chip_ids_list = json.loads(chip_ids)
+            chip_ids_list = chip_ids_by_interaction[interaction_id]
             try:
-                chip_modes_list = ast.literal_eval(chip_modes)
+                chip_modes_list = _load_sequence_column(chip_modes)
             except (ValueError, SyntaxError):
+                chip_modes_list = None
+            if chip_modes_list is None:
                 chip_modes_list = ["screen"] * len(chip_ids_list)
 
             try:
-                original_resolutions_list = ast.literal_eval(original_resolutions) if original_resolutions else []
-                actual_resolutions_list = ast.literal_eval(actual_resolutions) if actual_resolutions else []
-            except (TypeError, ValueError, json.JSONDecodeError):
+                original_resolutions_list = _load_sequence_column(original_resolutions) or []
+                actual_resolutions_list = _load_sequence_column(actual_resolutions) or []
+            except (TypeError, ValueError, SyntaxError):
                 original_resolutions_list = []
                 actual_resolutions_list = []
 
@@ -1624,13 +1968,13 @@ class LibreGeoLensDockWidget(QDockWidget):
                 actual_resolutions_list = ["Unknown"] * len(chip_ids_list)
 
             for idx, (chip_id, chip_mode) in enumerate(zip(chip_ids_list, chip_modes_list)):
-                chip = self.logs_db.fetch_chip_by_id(chip_id)
+                chip = chips_by_id.get(chip_id)
                 if not chip:
                     continue
 
                 image_path = chip[1]
                 normalized_path = self._normalize_path(image_path)
-                display_mode = "Raw" if chip_mode == "raw" else "Screen"
+                display_mode = _CHIP_MODE_LABELS.get(chip_mode, _DEFAULT_CHIP_MODE_LABEL)
 
                 original_res = original_resolutions_list[idx] if idx < len(original_resolutions_list) else "Unknown"
                 actual_res = actual_resolutions_list[idx] if idx < len(actual_resolutions_list) else "Unknown"
@@ -1652,69 +1996,46 @@ class LibreGeoLensDockWidget(QDockWidget):
 
         self.render_chat_history()
 
+    def set_chat_history_html(self, html):
+        """Shows HTML that render_chat_history did not produce, so its next call can't skip setHtml."""
+        self._chat_history_html = None
+        self.chat_history.setHtml(html)
+
     def render_chat_history(self, scroll_to_end=True):
         if not self.rendered_interactions:
             self.chat_history.clear()
             return
 
         html_parts = []
+        # Bound once, this loop runs over the whole history for every streamed token
+        append = html_parts.append
+        supports_reasoning_for_model = self.supports_reasoning_for_model
+        entry_render_key = self._entry_render_key
+        # A chat uses few (service, model) pairs; overrides can change between renders, so only cached for this one
+        supports_reasoning_by_model = {}
 
         for entry in self.rendered_interactions:
-            user_html = markdown.markdown(f"**User:** {entry['prompt']}")
-            html_parts.append(
-                f'<div id="interaction-{entry["display_id"]}">{user_html}</div>'
-            )
-
             if entry.get("is_user_only"):
-                continue
-
-            for chip in entry.get("chips", []):
-                resolution_span = ""
-                if chip.get("resolution_text"):
-                    resolution_span = (
-                        f'<span style="position: absolute; bottom: 3px; left: 5px; color: {self.text_color}; '
-                        f'font-size: 10px">{chip["resolution_text"]}</span>'
-                    )
-
-                html_parts.append(
-                    f'<div style="position: relative; display: inline-block;">'
-                    f'    <a href="image://{chip["image_path"]}" style="text-decoration: none;">'
-                    f'        <img src="file:///{chip["image_path"]}" width="75" loading="lazy"/>'
-                    f'    </a>'
-                    f'    <span style="position: absolute; top: 3px; right: 5px; color: {self.text_color}; font-size: 10px">'
-                    f'        ({chip["mode_label"]} Chip)'
-                    f'    </span>'
-                    f'{resolution_span}'
-                    f'</div>'
-                )
-
-            assistant_turn_start_text = f"**{entry['mllm_model']} ({entry['mllm_service']}):**"
-
-            response_text = entry.get("response_stream") if entry.get("is_pending") else entry.get("response", "")
-            response_text = response_text or ""
-
-            if self.supports_reasoning_for_model(entry.get('mllm_service'), entry.get('mllm_model')):
-                html_parts.append(
-                    self._build_reasoning_section_html(entry, assistant_turn_start_text)
-                )
-                assistant_turn_start_text = ""
-
-            if response_text:
-                content_to_render = (
-                    response_text if not assistant_turn_start_text else
-                    f"{assistant_turn_start_text} {response_text}"
-                )
-                assistant_markdown = markdown.markdown(content_to_render)
+                supports_reasoning = False
             else:
-                assistant_markdown = (
-                    markdown.markdown(assistant_turn_start_text)
-                    if assistant_turn_start_text else ""
-                )
-
-            if assistant_markdown:
-                html_parts.append(f'<div>{assistant_markdown}</div>')
+                model_key = (entry.get('mllm_service'), entry.get('mllm_model'))
+                supports_reasoning = supports_reasoning_by_model.get(model_key)
+                if supports_reasoning is None:
+                    supports_reasoning = supports_reasoning_for_model(*model_key)
+                    supports_reasoning_by_model[model_key] = supports_reasoning
+            # Only entries whose inputs changed (typically the streaming one) are converted again
+            render_key = entry_render_key(entry, supports_reasoning)
+            cached = entry.get("_rendered_html")
+            if cached is None or cached[0] != render_key:
+                cached = (render_key, self._render_entry_html(entry, supports_reasoning))
+                entry["_rendered_html"] = cached
+            append(cached[1])
 
         html = ''.join(html_parts)
+        # e.g. reasoning tokens streamed while the reasoning section is collapsed, nothing visible changed
+        if html == self._chat_history_html and not self.chat_history.document().isEmpty():
+            return
+        self._chat_history_html = html
         scrollbar = self.chat_history.verticalScrollBar()
 
         if scrollbar is not None:
@@ -1729,6 +2050,71 @@ class LibreGeoLensDockWidget(QDockWidget):
         else:
             self.chat_history.setHtml(html)
 
+    def _entry_render_key(self, entry, supports_reasoning):
+        """Everything _render_entry_html reads, so a cached fragment is reused only while it is still valid"""
+        if entry.get("is_pending"):
+            response_text, reasoning_text = entry.get("response_stream"), entry.get("reasoning_stream")
+        else:
+            response_text, reasoning_text = entry.get("response", ""), entry.get("reasoning")
+        return (
+            entry["display_id"], entry["prompt"], entry.get("is_user_only"), self.text_color,
+            tuple((chip["image_path"], chip["mode_label"], chip.get("resolution_text"))
+                  for chip in entry.get("chips", [])),
+            entry.get("mllm_model"), entry.get("mllm_service"), supports_reasoning, entry.get("is_pending"),
+            entry.get("reasoning_visible"), response_text, reasoning_text,
+        )
+
+    def _render_entry_html(self, entry, supports_reasoning):
+        html_parts = []
+
+        user_html = _markdown_to_html(f"**User:** {entry['prompt']}")
+        html_parts.append(
+            f'<div id="interaction-{entry["display_id"]}">{user_html}</div>'
+        )
+
+        if entry.get("is_user_only"):
+            return ''.join(html_parts)
+
+        chip_html_template, chip_resolution_template = self._chip_html_template, self._chip_resolution_template
+        for chip in entry.get("chips", []):
+            resolution_text = chip.get("resolution_text")
+            html_parts.append(chip_html_template.format(
+                image_path=chip["image_path"],
+                mode_label=chip["mode_label"],
+                resolution_span=(
+                    chip_resolution_template.format(resolution_text=resolution_text)
+                    if resolution_text else ""
+                ),
+            ))
+
+        assistant_turn_start_text = f"**{entry['mllm_model']} ({entry['mllm_service']}):**"
+
+        response_text = entry.get("response_stream") if entry.get("is_pending") else entry.get("response", "")
+        response_text = response_text or ""
+
+        if supports_reasoning:
+            html_parts.append(
+                self._build_reasoning_section_html(entry, assistant_turn_start_text)
+            )
+            assistant_turn_start_text = ""
+
+        if response_text:
+            content_to_render = (
+                response_text if not assistant_turn_start_text else
+                f"{assistant_turn_start_text} {response_text}"
+            )
+            assistant_markdown = _markdown_to_html(content_to_render)
+        else:
+            assistant_markdown = (
+                _markdown_to_html(assistant_turn_start_text)
+                if assistant_turn_start_text else ""
+            )
+
+        if assistant_markdown:
+            html_parts.append(f'<div>{assistant_markdown}</div>')
+
+        return ''.join(html_parts)
+
     def _on_chat_history_scroll(self, _):
         scrollbar = self.chat_history.verticalScrollBar()
         if scrollbar is None:
@@ -1746,33 +2132,6 @@ class LibreGeoLensDockWidget(QDockWidget):
         reasoning_text = entry.get("reasoning_stream") if entry.get("is_pending") else entry.get("reasoning")
         reasoning_text = reasoning_text or ""
 
-        def _add_block_styles(html: str) -> str:
-            block_styles = {
-                "p": "margin: 0 0 8px 0;",
-                "ul": "margin: 0 0 8px 18px; padding-left: 18px;",
-                "ol": "margin: 0 0 8px 18px; padding-left: 18px;",
-                "pre": (
-                    "margin: 0 0 8px 0; padding: 8px; border-radius: 4px; "
-                    "background-color: rgba(255, 255, 255, 0.35);"
-                ),
-                "blockquote": (
-                    "margin: 0 0 8px 0; padding-left: 10px; "
-                    "border-left: 3px solid rgba(79, 70, 229, 0.35);"
-                ),
-            }
-
-            pattern = re.compile(r'<(p|ul|ol|pre|blockquote)([^>]*)>')
-
-            def _inject_style(match) -> str:
-                tag = match.group(1)
-                attrs = match.group(2) or ""
-                if "style=" in attrs:
-                    return match.group(0)
-                return f'<{tag}{attrs} style="{block_styles[tag]}">' \
-                    if attrs else f'<{tag} style="{block_styles[tag]}">'
-
-            return pattern.sub(_inject_style, html)
-
         highlight_styles = "color: #4b5563"
 
         toggle_styles = (
@@ -1789,19 +2148,19 @@ class LibreGeoLensDockWidget(QDockWidget):
 
         assistant_html = ""
         if assistant_intro_text:
-            assistant_html = markdown.markdown(assistant_intro_text)
+            assistant_html = _markdown_to_html(assistant_intro_text)
 
         body_html = ""
         if entry.get("reasoning_visible"):
             if reasoning_text.strip():
-                reasoning_html = markdown.markdown(reasoning_text)
+                reasoning_html = _markdown_to_html(reasoning_text)
             else:
                 if entry.get("is_pending"):
                     reasoning_html = "<p><i>Reasoning content not yet available.</i></p>"
                 else:
                     reasoning_html = "<p><i>Reasoning content not available.</i></p>"
 
-            reasoning_html = _add_block_styles(reasoning_html)
+            reasoning_html = _REASONING_BLOCK_TAG_RE.sub(_inject_reasoning_block_style, reasoning_html)
             body_html = f'<div style="margin: 0; line-height: 1.55;">{reasoning_html}</div>'
 
         return (
@@ -1829,76 +2188,89 @@ class LibreGeoLensDockWidget(QDockWidget):
         return path_value.replace('\\', '/')
 
     def load_image_base64_downscale_if_needed(self, image_path, api):
-        image = Image.open(image_path)
-        orig_width, orig_height = image.size
-        final_width, final_height = orig_width, orig_height  # Default to original size
-        was_resized = False
-
         api_config = self.supported_api_clients.get(api, {})
         limits = api_config.get("limits", {})
 
-        # Process pixel-based limits
-        if "image_px" in limits:
-            px_limits = limits["image_px"]
-            longest_side_limit = px_limits.get("longest_side")
-            shortest_side_limit = px_limits.get("shortest_side")
-
-            longest = max(orig_width, orig_height)
-            shortest = min(orig_width, orig_height)
-
-            # Check if image already meets both constraints.
-            if longest > longest_side_limit or shortest > shortest_side_limit:
-                # Compute scale factors for each constraint.
-                factor_longest = longest_side_limit / longest  # to keep the longest side within limit
-                factor_shortest = shortest_side_limit / shortest  # to keep the shortest side within limit
-
-                # Choose the smallest factor; also do not upscale (max factor = 1).
-                scale_factor = min(1, factor_longest, factor_shortest)
-
-                final_width = int(round(orig_width * scale_factor))
-                final_height = int(round(orig_height * scale_factor))
-                was_resized = True
-                image = image.resize((final_width, final_height))
-
-            # Save the (possibly resized) image into a buffer as PNG
-            buffer = io.BytesIO()
-            image.save(buffer, format="PNG")
-
-        # Otherwise, if the client has a file size limit in MB
-        elif "image_mb" in limits:
-            max_mb = limits["image_mb"]
-            # Save the original image as PNG with optimization and maximum compression
-            buffer = io.BytesIO()
-            image.save(buffer, format="PNG")
-            file_size_mb = buffer.tell() / (1024 * 1024)
-
-            # If the file size exceeds the allowed limit, predict a downscaling factor
-            if file_size_mb > max_mb:
-                # Predict the scaling factor assuming file size scales roughly with image area
-                scaling_factor = math.sqrt(max_mb / file_size_mb)
-                # Only downsample if scaling_factor < 1 (avoid upsampling)
-                if scaling_factor < 1.0:
-                    final_width = int(orig_width * scaling_factor)
-                    final_height = int(orig_height * scaling_factor)
-                    was_resized = True
-                    image = image.resize((final_width, final_height))
-                # Re-encode the resized image
+        # Image.open only reads the header here; pixels are decoded only if the image has to be resized
+        with Image.open(image_path) as image:
+            orig_width, orig_height = image.size
+            is_png = image.format == "PNG"
+            target_size = None
+            png_buffer = None  # PNG encoding of the original image, when one had to be made
+
+            # Process pixel-based limits
+            if "image_px" in limits:
+                px_limits = limits["image_px"]
+                longest_side_limit = px_limits.get("longest_side")
+                shortest_side_limit = px_limits.get("shortest_side")
+
+                longest = max(orig_width, orig_height)
+                shortest = min(orig_width, orig_height)
+
+                # Check if image already meets both constraints.
+                if longest > longest_side_limit or shortest > shortest_side_limit:
+                    # Compute scale factors for each constraint.
+                    factor_longest = longest_side_limit / longest  # to keep the longest side within limit
+                    factor_shortest = shortest_side_limit / shortest  # to keep the shortest side within limit
+
+                    # Choose the smallest factor; also do not upscale (max factor = 1).
+                    scale_factor = min(1, factor_longest, factor_shortest)
+
+                    target_size = (int(round(orig_width * scale_factor)), int(round(orig_height * scale_factor)))
+
+            # Otherwise, if the client has a file size limit in MB
+            elif "image_mb" in limits:
+                max_mb = limits["image_mb"]
+                # Chips are written as PNG, so the file on disk is what encoding it again would produce
+                if is_png:
+                    file_size_mb = os.path.getsize(image_path) / (1024 * 1024)
+                else:
+                    png_buffer = io.BytesIO()
+                    image.save(png_buffer, format="PNG")
+                    file_size_mb = png_buffer.tell() / (1024 * 1024)
+
+                # If the file size exceeds the allowed limit, predict a downscaling factor
+                if file_size_mb > max_mb:
+                    # Predict the scaling factor assuming file size scales roughly with image area
+                    scaling_factor = math.sqrt(max_mb / file_size_mb)
+                    # Only downsample if scaling_factor < 1 (avoid upsampling)
+                    if scaling_factor < 1.0:
+                        target_size = (int(orig_width * scaling_factor), int(orig_height * scaling_factor))
+
+            if target_size is not None:
+                # Same call and default resampling as before, so resized chips keep their exact size
+                image = image.resize(target_size)
                 buffer = io.BytesIO()
                 image.save(buffer, format="PNG")
+                image_bytes = buffer.getbuffer()  # memoryview, no copy of the encoded PNG
+            elif is_png:
+                # Nothing to resize, so the PNG file is sent as is instead of being decoded and encoded again
+                with open(image_path, "rb") as f:
+                    image_bytes = f.read()
+            else:
+                # Reuse the encoding made to measure the size against image_mb, if any
+                if png_buffer is None:
+                    png_buffer = io.BytesIO()
+                    image.save(png_buffer, format="PNG")
+                image_bytes = png_buffer.getbuffer()  # memoryview, no copy of the encoded PNG
 
-        else:
-            # If no image limits are defined, just encode the image as PNG.
-            buffer = io.BytesIO()
-            image.save(buffer, format="PNG")
+            final_width, final_height = image.size
 
         # Return a tuple with the base64-encoded string and dimension info
         dimensions = {
             "original": f"{orig_width}x{orig_height}", 
             "final": f"{final_width}x{final_height}",
-            "was_resized": was_resized
+            "was_resized": target_size is not None
         }
         
-        return base64.b64encode(buffer.getvalue()).decode("utf-8"), dimensions
+        return base64.b64encode(image_bytes).decode("ascii"), dimensions
+
+    @staticmethod
+    def create_spatial_index(layer):
+        """Build the provider's spatial index for rectangle queries, when the provider supports one"""
+        provider = layer.dataProvider()
+        if provider is not None and provider.capabilities() & QgsVectorDataProvider.CreateSpatialIndex:
+            provider.createSpatialIndex()
 
     @staticmethod
     def style_geojson_layer(geojson_layer, color=(255, 0, 0)):
@@ -1929,10 +2301,12 @@ class LibreGeoLensDockWidget(QDockWidget):
             self.load_geojson_from_s3()
         elif source == "Use Demo Resources":
             self.load_geojson_from_demo()
-        settings = QSettings("Ampsight", "LibreGeoLens")
+        settings = self._settings
         settings.setValue("geojson_path", self.geojson_path)
 
     def load_geojson_from_demo(self):
+        import requests
+
         demo_geojson_path = os.path.join(self.logs_dir, "demo_imagery.geojson")
         if not os.path.exists(demo_geojson_path):
             try:
@@ -1958,7 +2332,9 @@ class LibreGeoLensDockWidget(QDockWidget):
         self.replace_geojson_layer()
 
     def load_geojson_from_s3(self):
-        settings = QSettings("Ampsight", "LibreGeoLens")
+        import boto3
+
+        settings = self._settings
         default_s3_directory = settings.value("default_s3_directory", "")
 
         s3_path, ok = QInputDialog.getText(
@@ -2028,11 +2404,13 @@ class LibreGeoLensDockWidget(QDockWidget):
             QMessageBox.critical(self.iface.mainWindow(), "Error", "Failed to load GeoJSON layer.")
             return
 
+        self.create_spatial_index(self.geojson_layer)
+
         # Add the new GeoJSON layer and style it
         project.addMapLayer(self.geojson_layer)
         self.style_geojson_layer(self.geojson_layer)
         self.tracked_layers.append(self.geojson_layer.id())
-        self.tracked_layers_names.append("geojson_layer")
+        self.tracked_layers_names.add("geojson_layer")
 
         self.handle_log_layer()
 
@@ -2059,6 +2437,27 @@ class LibreGeoLensDockWidget(QDockWidget):
         else:
             return self._create_memory_log_layer()
 
+    def _purge_null_image_features(self):
+        """Delete the temporary drawing features (no ImagePath) from the log layer"""
+        # Let the provider evaluate the filter and skip geometry/attributes, only the feature ids are needed
+        request = (QgsFeatureRequest()
+                   .setFilterExpression('"ImagePath" IS NULL OR "ImagePath" = \'NULL\'')
+                   .setFlags(QgsFeatureRequest.NoGeometry)
+                   .setNoAttributes())
+        features_to_remove = [feature.id() for feature in self.log_layer.getFeatures(request)]
+        if not features_to_remove:
+            return
+        provider = self.log_layer.dataProvider()
+        if provider.capabilities() & QgsVectorDataProvider.DeleteFeatures:
+            # Straight to the provider, no edit session (and its commit bookkeeping) needed
+            provider.deleteFeatures(features_to_remove)
+        else:
+            self.log_layer.startEditing()
+            self.log_layer.deleteFeatures(features_to_remove)
+            self.log_layer.commitChanges()
+        self.log_layer.updateExtents()
+        self.log_layer.triggerRepaint()
+
     @staticmethod
     def _create_memory_log_layer():
         layer = QgsVectorLayer("Polygon?crs=EPSG:4326", "Logs", "memory")
@@ -2115,16 +2514,28 @@ class LibreGeoLensDockWidget(QDockWidget):
             self.display_cogs_within_rectangle(rectangle)
             return
 
+        if self._capture_job is not None:
+            # The previous area is still rendering, so its chip can't be overtaken by this one
+            self.area_drawing_tool.rubber_band.reset(QgsWkbTypes.PolygonGeometry)
+            return
+
         rectangle_geom = self.transform_rectangle_crs(rectangle, QgsCoordinateReferenceSystem("EPSG:4326"))
 
+        # Capture the image within the drawn area, the chip is added once the map has been rendered
+        chat_id = self.current_chat_id
+        self.capture_drawn_area(rectangle, lambda image: self._on_drawn_area_captured(image, rectangle_geom, chat_id))
+
+    def _on_drawn_area_captured(self, image, rectangle_geom, chat_id):
+        if chat_id != self.current_chat_id:
+            # Another chat was opened while the area rendered, the chip belongs to neither
+            return
+
         # Add the drawn area as a temporary feature
         feature = QgsFeature(self.log_layer.fields())
         feature.setGeometry(rectangle_geom)
         chip_id = str(uuid.uuid4())  # temp uuid until the chip is saved if eventually sent to the MLLM
         feature.setAttributes([json.dumps({}), None, chip_id])
 
-        # Capture the image within the drawn area
-        image = self.capture_drawn_area(rectangle)
         self.image_display_widget.add_image(image=image)
         self.image_display_widget.images[-1]["rectangle_geom"] = rectangle_geom
         self.image_display_widget.images[-1]["chip_id"] = chip_id
@@ -2142,10 +2553,11 @@ class LibreGeoLensDockWidget(QDockWidget):
         rectangle_geom.transform(transform)
         return rectangle_geom
 
-    def capture_drawn_area(self, rectangle):
-        """Captures the drawn area as an image using the input rectangle"""
-        # Set the map settings extent
-        settings = self.canvas.mapSettings()
+    def capture_drawn_area(self, rectangle, on_captured):
+        """Renders the drawn area in the background and passes the image to on_captured when it is done"""
+        # A private copy per capture, so captures in flight never share or touch the canvas settings
+        settings = QgsMapSettings(self.canvas.mapSettings())
+        settings.setOutputImageFormat(QImage.Format_ARGB32_Premultiplied)
         settings.setExtent(rectangle)
 
         # Adjust output size to match rectangle aspect ratio
@@ -2160,12 +2572,26 @@ class LibreGeoLensDockWidget(QDockWidget):
             new_height = int(map_width / aspect_ratio)
             settings.setOutputSize(QSize(map_width, new_height))
 
-        image = QImage(settings.outputSize(), QImage.Format_ARGB32_Premultiplied)
         renderer = QgsMapRendererParallelJob(settings)
+
+        def on_finished():
+            # Runs on the GUI thread, the job is only kept alive until then
+            self._capture_job = None
+            self._set_draw_area_enabled(True)
+            on_captured(renderer.renderedImage())
+
+        # Drawing is disabled until the image is handed over, so chips are added in the order they were drawn
+        self._capture_job = renderer
+        self._set_draw_area_enabled(False)
+        renderer.finished.connect(on_finished)
         renderer.start()
-        renderer.waitForFinished()
 
-        return renderer.renderedImage()
+    def _set_draw_area_enabled(self, enabled):
+        """Enable or disable the draw button, deferring to the state restored when a stream unlocks the UI"""
+        if self._stream_locked_states is not None and self.draw_area_button in self._stream_locked_states:
+            self._stream_locked_states[self.draw_area_button] = enabled
+        else:
+            self.draw_area_button.setEnabled(enabled)
 
     def activate_identify_drawn_area_tool(self):
         if self.area_drawing_tool:
@@ -2176,6 +2602,33 @@ class LibreGeoLensDockWidget(QDockWidget):
         self.identify_drawn_area_tool = IdentifyDrawnAreaTool(self.canvas, self.log_layer, self)
         self.canvas.setMapTool(self.identify_drawn_area_tool)
 
+    def find_untracked_cogs_intersecting(self, rectangle_geom):
+        """Remote paths of the footprints intersecting rectangle_geom (in the GeoJSON layer CRS) not loaded yet"""
+        rectangle_bbox = rectangle_geom.boundingBox()
+        # A rectangle outside the layer's extent cannot hit any footprint, no need to read the features
+        if not rectangle_bbox.intersects(self.geojson_layer.extent()):
+            return []
+
+        # Find features that intersect with the rectangle, the provider only returns those whose bbox overlaps it
+        request = (QgsFeatureRequest()
+                   .setFilterRect(rectangle_bbox)
+                   .setSubsetOfAttributes(["remote_path"], self.geojson_layer.fields()))
+        # Prepared once, so each exact test reuses the rectangle's index instead of rebuilding it
+        rectangle_engine = QgsGeometry.createGeometryEngine(rectangle_geom.constGet())
+        rectangle_engine.prepareGeometry()
+        # Unless reprojection skewed it, the drawn area is its own bbox, and any footprint
+        # whose bbox lies inside it intersects it without an exact test
+        is_axis_aligned = rectangle_geom.isGeosEqual(QgsGeometry.fromRect(rectangle_bbox))
+        cogs_paths = []
+        for feature in self.geojson_layer.getFeatures(request):
+            geometry = feature.geometry()
+            if (is_axis_aligned and rectangle_bbox.contains(geometry.boundingBox())) or \
+                    rectangle_engine.intersects(geometry.constGet()):
+                remote_path = feature["remote_path"]
+                if remote_path and remote_path not in self.tracked_layers_names:
+                    cogs_paths.append(remote_path)
+        return cogs_paths
+
     def display_cogs_within_rectangle(self, rectangle):
         """Displays only the COGs within the given rectangle on the QGIS UI
            and ensures logs and polygons layers remain on top."""
@@ -2192,13 +2645,7 @@ class LibreGeoLensDockWidget(QDockWidget):
         # Record how many layers are currently tracked
         old_count = len(self.tracked_layers)
 
-        # Find features that intersect with the rectangle
-        cogs_paths = []
-        for feature in self.geojson_layer.getFeatures():
-            if feature.geometry().intersects(rectangle_geom):
-                remote_path = feature["remote_path"]
-                if remote_path and remote_path not in self.tracked_layers_names:
-                    cogs_paths.append(remote_path)
+        cogs_paths = self.find_untracked_cogs_intersecting(rectangle_geom)
 
         def load_cog(remote_path):
             if remote_path.startswith("s3://"):
@@ -2217,9 +2664,7 @@ class LibreGeoLensDockWidget(QDockWidget):
                 QgsProject.instance().addMapLayer(raster_layer)
                 self.tracked_layers.append(raster_layer.id())
                 self.cogs_dict[raster_layer.id()] = remote_path
-                settings = QSettings("Ampsight", "LibreGeoLens")
-                settings.setValue("cogs_dict", json.dumps(self.cogs_dict))  # Save as JSON string
-                self.tracked_layers_names.append(remote_path)
+                self.tracked_layers_names.add(remote_path)
             else:
                 QMessageBox.warning(
                     self.iface.mainWindow(),
@@ -2251,18 +2696,32 @@ class LibreGeoLensDockWidget(QDockWidget):
         root = QgsProject.instance().layerTreeRoot()
         log_layer_node = root.findLayer(self.log_layer.id())
         geojson_layer_node = root.findLayer(self.geojson_layer.id())
-        # Move the log layer to the top
-        if log_layer_node:
-            root.insertChildNode(0, log_layer_node.clone())
-            root.removeChildNode(log_layer_node)
-        # Move the GeoJSON (polygon) layer to the second position
-        if geojson_layer_node:
-            root.insertChildNode(1, geojson_layer_node.clone())
-            root.removeChildNode(geojson_layer_node)
+        # Nodes already in place (the usual case once COGs have been loaded before) are left alone,
+        # and the canvas only redraws once after any moves
+        moved = False
+        self.canvas.freeze(True)
+        try:
+            # Move the log layer to the top
+            if log_layer_node and root.children()[:1] != [log_layer_node]:
+                root.insertChildNode(0, log_layer_node.clone())
+                root.removeChildNode(log_layer_node)
+                moved = True
+            # Move the GeoJSON (polygon) layer to the second position
+            if geojson_layer_node and root.children()[1:2] != [geojson_layer_node]:
+                root.insertChildNode(1, geojson_layer_node.clone())
+                root.removeChildNode(geojson_layer_node)
+                moved = True
+        finally:
+            self.canvas.freeze(False)
+        if moved:
+            self.canvas.refresh()
 
         # compare old vs. new count of tracked layers
         new_count = len(self.tracked_layers)
         cogs_added = new_count - old_count
+        if cogs_added:
+            # Written once for all the COGs loaded above
+            self._settings.setValue("cogs_dict", _settings_dumps(self.cogs_dict))  # Save as JSON string
         if cogs_added == 0:
             QMessageBox.information(
                 self.iface.mainWindow(),
@@ -2296,38 +2755,6 @@ class LibreGeoLensDockWidget(QDockWidget):
     
     def show_chip_info(self):
         """Display information about chip types and image limits in a non-modal dialog."""
-        info_text = """
-<h3>Chip Types:</h3>
-<p><b>Screen Chip:</b> A screenshot of what you see in QGIS. Includes all visible layers, labels, and styling.</p>
-<p><b>Raw Chip:</b> The original imagery data extracted directly from the source (COG).
- Contains only the raw imagery without any QGIS styling or overlays. Note that extracting large chips will be resource intensive.</p>
-
-<h3>Image Limits by MLLM Service:</h3>
-<ul>
-"""
-        # Dynamically generate limits information from supported_api_clients
-        for api_name, api_info in self.supported_api_clients.items():
-            info_text += f"<li><b>{api_name}:</b>"
-            limits = api_info.get("limits", {})
-
-            if not limits:
-                info_text += " None<ul>"
-            else:
-                info_text += "<ul>"
-                if "image_px" in limits:
-                    px_limits = limits["image_px"]
-                    info_text += f"<li>Max dimensions: {px_limits.get('longest_side')}px (longest side), {px_limits.get('shortest_side')}px (shortest side)</li>"
-
-                if "image_mb" in limits:
-                    info_text += f"<li>Max file size: {limits['image_mb']}MB</li>"
-                
-            info_text += "</ul></li>"
-        
-        info_text += """
-</ul>
-<p><b>Note:</b> Images will be automatically downsampled if they exceed these limits.</p>
-"""
-
         # Check if we already have an open info dialog
         if self.info_dialog is not None:
             # If dialog exists, just make sure it's visible and bring to front
@@ -2346,7 +2773,7 @@ class LibreGeoLensDockWidget(QDockWidget):
         
         # Create text browser for rich text display
         text_browser = QTextBrowser()
-        text_browser.setHtml(info_text)
+        text_browser.setHtml(self._chip_info_html())
         layout.addWidget(text_browser)
 
         # Add a close button
@@ -2362,18 +2789,59 @@ class LibreGeoLensDockWidget(QDockWidget):
         # Show the dialog non-modally
         self.info_dialog.show()
 
+    def _chip_info_html(self):
+        """HTML of the chip info dialog, rebuilt only when supported_api_clients has been rebuilt"""
+        cached_clients, cached_html = self._chip_info_html_cache
+        if cached_clients is self.supported_api_clients:
+            return cached_html
+
+        parts = ["""
+<h3>Chip Types:</h3>
+<p><b>Screen Chip:</b> A screenshot of what you see in QGIS. Includes all visible layers, labels, and styling.</p>
+<p><b>Raw Chip:</b> The original imagery data extracted directly from the source (COG).
+ Contains only the raw imagery without any QGIS styling or overlays. Note that extracting large chips will be resource intensive.</p>
+
+<h3>Image Limits by MLLM Service:</h3>
+<ul>
+"""]
+        # Dynamically generate limits information from supported_api_clients
+        for api_name, api_info in self.supported_api_clients.items():
+            parts.append(f"<li><b>{api_name}:</b>")
+            limits = api_info.get("limits", {})
+
+            if not limits:
+                parts.append(" None<ul>")
+            else:
+                parts.append("<ul>")
+                if "image_px" in limits:
+                    px_limits = limits["image_px"]
+                    parts.append(f"<li>Max dimensions: {px_limits.get('longest_side')}px (longest side), {px_limits.get('shortest_side')}px (shortest side)</li>")
+
+                if "image_mb" in limits:
+                    parts.append(f"<li>Max file size: {limits['image_mb']}MB</li>")
+
+            parts.append("</ul></li>")
+
+        parts.append("""
+</ul>
+<p><b>Note:</b> Images will be automatically downsampled if they exceed these limits.</p>
+""")
+        html = "".join(parts)
+        self._chip_info_html_cache = (self.supported_api_clients, html)
+        return html
+
     def on_info_dialog_closed(self):
         """Reset the info_dialog reference when the dialog is closed"""
         self.info_dialog = None
 
     def load_service_configurations(self):
         """Load persisted service overrides from QSettings."""
-        settings = QSettings("Ampsight", "LibreGeoLens")
+        settings = self._settings
         stored = settings.value("service_configurations", "{}")
         parsed = {}
         if isinstance(stored, str):
             try:
-                parsed = json.loads(stored)
+                parsed = _settings_loads(stored)
             except json.JSONDecodeError:
                 parsed = {}
         elif isinstance(stored, dict):
@@ -2387,8 +2855,15 @@ class LibreGeoLensDockWidget(QDockWidget):
 
     def save_service_configurations(self):
         """Persist service overrides to QSettings."""
-        settings = QSettings("Ampsight", "LibreGeoLens")
-        settings.setValue("service_configurations", json.dumps(self.service_configurations or {}))
+        self._save_settings_json("service_configurations", self.service_configurations or {})
+
+    def _save_settings_json(self, key, value):
+        """Store value as JSON text under key, skipping the write when it is what this dock last stored there"""
+        payload = _settings_dumps(value)
+        if self._saved_settings_payloads.get(key) == payload:
+            return
+        self._settings.setValue(key, payload)
+        self._saved_settings_payloads[key] = payload
 
     def build_supported_api_clients(self):
         """Combine built-in templates with user overrides and custom services."""
@@ -2404,7 +2879,12 @@ class LibreGeoLensDockWidget(QDockWidget):
         return merged
 
     def _compose_service_entry(self, name, template, user_config):
-        entry = copy.deepcopy(template) if template else {}
+        # Entries are only read once built, so copying the top-level containers is enough to keep
+        # the templates and the user configurations from being modified through them
+        entry = {
+            key: value.copy() if isinstance(value, (dict, list)) else value
+            for key, value in (template or {}).items()
+        }
         entry.setdefault("litellm_params", {})
         entry.setdefault("models", [])
         entry.setdefault("limits", {})
@@ -2413,7 +2893,7 @@ class LibreGeoLensDockWidget(QDockWidget):
         entry.setdefault("reasoning_overrides", {})
         entry["user_defined"] = not bool(template)
 
-        user_section = copy.deepcopy(user_config) if user_config else {}
+        user_section = dict(user_config) if user_config else {}
         provider_override = user_section.get("provider_name")
         if provider_override:
             entry["litellm_params"] = dict(entry.get("litellm_params", {}))
@@ -2422,7 +2902,7 @@ class LibreGeoLensDockWidget(QDockWidget):
         entry["supports_streaming"] = user_section.get("supports_streaming", entry.get("supports_streaming", True))
 
         if user_section.get("limits"):
-            entry["limits"] = copy.deepcopy(user_section["limits"])
+            entry["limits"] = dict(user_section["limits"])
 
         base_models = entry.get("models", [])
         user_base_models = user_section.get("base_models", [])
@@ -2435,7 +2915,7 @@ class LibreGeoLensDockWidget(QDockWidget):
             cleaned_overrides = {
                 str(model): state
                 for model, state in overrides.items()
-                if state in ("force_on", "force_off")
+                if state in _REASONING_OVERRIDE_STATES
             }
         else:
             cleaned_overrides = {}
@@ -2446,8 +2926,20 @@ class LibreGeoLensDockWidget(QDockWidget):
         entry["user_env_overrides"] = user_section.get("env_vars", {})
         entry["stored_api_key"] = user_section.get("api_key")
         entry["stored_api_base"] = user_section.get("api_base")
+        entry["env_vars_by_name"] = self._index_env_vars(entry["env_vars"])
+        entry["user_env_completion_kwargs"] = self._compute_user_env_completion_kwargs(entry)
         return entry
 
+    @staticmethod
+    def _index_env_vars(env_vars):
+        """Map env var names to their definitions; entries may be plain names instead of dicts"""
+        indexed = {}
+        for env_info in env_vars:
+            name = env_info.get("name") if isinstance(env_info, dict) else env_info
+            if name:
+                indexed[name] = env_info
+        return indexed
+
     def apply_service_env_overrides(self):
         """Apply env var overrides defined in service configurations."""
         new_keys = set()
@@ -2467,12 +2959,12 @@ class LibreGeoLensDockWidget(QDockWidget):
 
     def load_added_models(self):
         """Load user-defined models for each provider from settings."""
-        settings = QSettings("Ampsight", "LibreGeoLens")
+        settings = self._settings
         stored = settings.value("added_models", "{}")
         parsed = {}
         if isinstance(stored, str):
             try:
-                parsed = json.loads(stored)
+                parsed = _settings_loads(stored)
             except json.JSONDecodeError:
                 parsed = {}
         elif isinstance(stored, dict):
@@ -2490,8 +2982,7 @@ class LibreGeoLensDockWidget(QDockWidget):
         """Persist user-defined models per provider."""
         serializable = {api: self._deduplicate_preserve_order(models)
                         for api, models in self.added_models.items() if models}
-        settings = QSettings("Ampsight", "LibreGeoLens")
-        settings.setValue("added_models", json.dumps(serializable))
+        self._save_settings_json("added_models", serializable)
 
     def refresh_available_api_clients(self):
         """Populate the provider dropdown based on configured credentials."""
@@ -2517,8 +3008,7 @@ class LibreGeoLensDockWidget(QDockWidget):
 
         self.api_selection.setEnabled(True)
         self.model_selection.setEnabled(True)
-        for api_name in sorted(list(self.available_api_clients.keys())):
-            self.api_selection.addItem(api_name)
+        self.api_selection.addItems(sorted(self.available_api_clients))
 
         del model_blocker
         del api_blocker
@@ -2568,13 +3058,13 @@ class LibreGeoLensDockWidget(QDockWidget):
         return [API_KEY_SENTINEL]
 
     def load_last_mllm_selection(self):
-        settings = QSettings("Ampsight", "LibreGeoLens")
+        settings = self._settings
         service = settings.value("last_mllm_service", "", type=str) or None
         model = settings.value("last_mllm_model", "", type=str) or None
         return service, model
 
     def persist_mllm_selection(self):
-        settings = QSettings("Ampsight", "LibreGeoLens")
+        settings = self._settings
 
         if not getattr(self, "available_api_clients", {}):
             settings.remove("last_mllm_service")
@@ -2668,6 +3158,9 @@ class LibreGeoLensDockWidget(QDockWidget):
         text = str(raw_value).strip()
         if text == "":
             return ""
+        # Plain strings (the common case) cannot parse, skip the two failing parser attempts and their exceptions
+        if text[0] not in _LITERAL_START_CHARS and text not in _LITERAL_KEYWORDS:
+            return raw_value
 
         for parser in (json.loads, ast.literal_eval):
             try:
@@ -2679,19 +3172,21 @@ class LibreGeoLensDockWidget(QDockWidget):
 
     def build_user_env_completion_kwargs(self, api_config):
         api_config = api_config or {}
+        # Composed service entries carry them precomputed, they only depend on the service configuration
+        precomputed = api_config.get("user_env_completion_kwargs")
+        if precomputed is not None:
+            return dict(precomputed)
+        return self._compute_user_env_completion_kwargs(api_config)
+
+    def _compute_user_env_completion_kwargs(self, api_config):
         extras = {}
         user_overrides = api_config.get("user_env_overrides") or {}
         if not user_overrides:
             return extras
 
-        defined_env_names = set()
-        for env_info in api_config.get("env_vars", []):
-            if isinstance(env_info, dict):
-                name = env_info.get("name")
-            else:
-                name = env_info
-            if name:
-                defined_env_names.add(name)
+        defined_env_names = api_config.get("env_vars_by_name")
+        if defined_env_names is None:
+            defined_env_names = self._index_env_vars(api_config.get("env_vars", []))
 
         reserved_keys = set((api_config.get("litellm_params") or {}).keys())
         reserved_keys.update({"api_key", "api_base"})
@@ -2741,14 +3236,8 @@ class LibreGeoLensDockWidget(QDockWidget):
 
     @staticmethod
     def _deduplicate_preserve_order(items):
-        seen = set()
-        result = []
-        for item in items:
-            if item in seen:
-                continue
-            seen.add(item)
-            result.append(item)
-        return result
+        # dicts keep insertion order, so this is an O(n) order-preserving dedup done in C
+        return list(dict.fromkeys(items))
 
     def supports_reasoning_for_model(self, api_name, model_name):
         if not model_name:
@@ -2772,26 +3261,28 @@ class LibreGeoLensDockWidget(QDockWidget):
         if override == "force_off":
             return False
 
-        try:
-            return litellm.supports_reasoning(model=model_name)
-        except Exception:
-            return False
+        return _litellm_supports_reasoning(model_name)
 
     @staticmethod
     def _split_assistant_content(content):
         text_parts = []
         reasoning_parts = []
 
-        def handle(fragment, force_reasoning=False):
+        # Depth-first walk with an explicit stack instead of one Python call per nested fragment;
+        # children are pushed in reverse so they are visited in their original order
+        stack = [(content, False)]
+        while stack:
+            fragment, force_reasoning = stack.pop()
             if fragment is None:
-                return
+                continue
             if isinstance(fragment, str):
                 (reasoning_parts if force_reasoning else text_parts).append(fragment)
-                return
+                continue
             if isinstance(fragment, (list, tuple)):
-                for item in fragment:
-                    handle(item, force_reasoning=force_reasoning)
-                return
+                stack.extend((item, force_reasoning) for item in reversed(fragment))
+                continue
+
+            children = []
             if isinstance(fragment, dict):
                 fragment_type = fragment.get("type")
                 type_lower = fragment_type.lower() if isinstance(fragment_type, str) else ""
@@ -2804,28 +3295,28 @@ class LibreGeoLensDockWidget(QDockWidget):
                         text_parts.append(fragment["text"])
 
                 if "content" in fragment:
-                    handle(fragment.get("content"), force_reasoning=current_force_reasoning)
+                    children.append((fragment.get("content"), current_force_reasoning))
 
                 if "reasoning" in fragment:
-                    handle(fragment.get("reasoning"), force_reasoning=True)
+                    children.append((fragment.get("reasoning"), True))
 
                 if "delta" in fragment:
-                    handle(fragment.get("delta"), force_reasoning=current_force_reasoning)
-                return
+                    children.append((fragment.get("delta"), current_force_reasoning))
+            else:
+                text_attr = getattr(fragment, "text", None)
+                if isinstance(text_attr, str):
+                    (reasoning_parts if force_reasoning else text_parts).append(text_attr)
 
-            text_attr = getattr(fragment, "text", None)
-            if isinstance(text_attr, str):
-                (reasoning_parts if force_reasoning else text_parts).append(text_attr)
+                content_attr = getattr(fragment, "content", None)
+                if content_attr is not None:
+                    children.append((content_attr, force_reasoning))
 
-            content_attr = getattr(fragment, "content", None)
-            if content_attr is not None:
-                handle(content_attr, force_reasoning=force_reasoning)
+                reasoning_attr = getattr(fragment, "reasoning", None)
+                if reasoning_attr is not None:
+                    children.append((reasoning_attr, True))
 
-            reasoning_attr = getattr(fragment, "reasoning", None)
-            if reasoning_attr is not None:
-                handle(reasoning_attr, force_reasoning=True)
+            stack.extend(reversed(children))
 
-        handle(content)
         return "".join(text_parts), "".join(reasoning_parts)
 
     @staticmethod
@@ -2849,6 +3340,11 @@ class LibreGeoLensDockWidget(QDockWidget):
             content = getattr(delta, "content", None)
             reasoning_payload = getattr(delta, "reasoning_content", None)
 
+        # Nearly every streamed delta carries plain strings, which need no walk through nested fragments
+        if (content is None or isinstance(content, str)) and \
+                (reasoning_payload is None or isinstance(reasoning_payload, str)):
+            return content or "", reasoning_payload or ""
+
         text, reasoning = LibreGeoLensDockWidget._split_assistant_content(content)
         if reasoning_payload:
             extra_text, extra_reasoning = LibreGeoLensDockWidget._split_assistant_content(reasoning_payload)
@@ -2901,14 +3397,16 @@ class LibreGeoLensDockWidget(QDockWidget):
         base_models = self.supported_api_clients.get(api, {}).get("models", [])
         added = self.added_models.get(api, [])
         combined = sorted(self._deduplicate_preserve_order(base_models + added))
-        self.model_selection.clear()
-        self.model_selection.addItems(combined)
-        if select_model and select_model in combined:
-            self.model_selection.setCurrentIndex(combined.index(select_model))
-        elif combined:
-            self.model_selection.setCurrentIndex(0)
-        else:
-            self.model_selection.setCurrentIndex(-1)
+        # Both callers persist the selection afterwards, so the intermediate index changes need no signals
+        with QSignalBlocker(self.model_selection):
+            self.model_selection.clear()
+            self.model_selection.addItems(combined)
+            if select_model and select_model in combined:
+                self.model_selection.setCurrentIndex(combined.index(select_model))
+            elif combined:
+                self.model_selection.setCurrentIndex(0)
+            else:
+                self.model_selection.setCurrentIndex(-1)
 
         self.update_reasoning_controls_state()
 
@@ -3271,7 +3769,7 @@ class LibreGeoLensDockWidget(QDockWidget):
             resolution_text = self._format_resolution_text(dimensions["original"], dimensions["final"])
             chips_display.append({
                 "image_path": normalized_path,
-                "mode_label": "Raw" if chip_mode == "raw" else "Screen",
+                "mode_label": _CHIP_MODE_LABELS.get(chip_mode, _DEFAULT_CHIP_MODE_LABEL),
                 "resolution_text": resolution_text,
             })
 
@@ -3345,11 +3843,8 @@ class LibreGeoLensDockWidget(QDockWidget):
             self.parse_stream_chunk,
             self.parse_completion_response
         )
-        thread = QThread()
-        worker.moveToThread(thread)
 
         request_context["worker"] = worker
-        request_context["thread"] = thread
         self.active_streams[entry_id] = request_context
         self._lock_ui_for_stream()
         self.cancel_mllm_button.setEnabled(True)
@@ -3358,11 +3853,9 @@ class LibreGeoLensDockWidget(QDockWidget):
         worker.stream_failed.connect(self._worker_stream_failed)
         worker.completed.connect(self._worker_completed)
         worker.failed.connect(self._worker_failed)
-        worker.done.connect(thread.quit)
         worker.done.connect(self._worker_done)
 
-        thread.started.connect(worker.run)
-        thread.start()
+        worker.start()
 
     def _disconnect_worker_stream_signals(self, worker):
         # Keep 'done' so cleanup proceeds; silence all others
@@ -3383,6 +3876,23 @@ class LibreGeoLensDockWidget(QDockWidget):
         except Exception:
             pass
 
+    def cancel_mllm_workers(self, silence_done=False):
+        """Cancel every request still in flight and silence its UI-updating signals
+
+        With silence_done, 'done' is disconnected too, for when the dock is torn down before the loop is stopped.
+        """
+        for context in self.active_streams.values():
+            worker = context.get("worker")
+            if worker is None:
+                continue
+            self._disconnect_worker_stream_signals(worker)
+            if silence_done:
+                try:
+                    worker.done.disconnect(self._worker_done)
+                except Exception:
+                    pass
+            worker.request_cancel()
+
     def cancel_active_mllm_request(self):
         if not self.active_streams:
             QMessageBox.information(
@@ -3422,7 +3932,7 @@ class LibreGeoLensDockWidget(QDockWidget):
 
         worker = context.get("worker")
         if worker is not None:
-            # Thread-safe cancellation into the worker's thread:
+            # Cancels the request's task on the MLLM event loop:
             QMetaObject.invokeMethod(worker, "request_cancel", Qt.QueuedConnection)
             # Prevent any other UI-updating signals from the cancelled worker:
             self._disconnect_worker_stream_signals(worker)
@@ -3694,27 +4204,17 @@ class LibreGeoLensDockWidget(QDockWidget):
             return
 
         worker = context.get("worker")
-        thread = context.get("thread")
 
         # 1) Make sure no more UI-updating signals can land
         if worker:
             self._disconnect_worker_stream_signals(worker)
 
-        # 2) Ensure the thread is stopped
-        if thread and thread.isRunning():
-            thread.quit()
-            # Be gentle; don’t hang the UI here if a provider misbehaves
-            thread.wait(100)
-
-        # 3) Now it’s safe to delete the objects
+        # 2) The request has finished on the event loop, so it's safe to delete the worker
         if worker:
             worker.deleteLater()
-        if thread:
-            thread.deleteLater()
 
-        # 4) Drop references and finish normal cleanup
+        # 3) Drop references and finish normal cleanup
         context.pop("worker", None)
-        context.pop("thread", None)
         self._cleanup_active_stream(entry_id, context)
 
     def _finalize_interaction(self, entry_id, entry, context, response_text, reasoning_text, skip_reload=False):
@@ -3753,7 +4253,7 @@ class LibreGeoLensDockWidget(QDockWidget):
             )
             if needs_reasoning:
                 summary_kwargs["reasoning_effort"] = "low"
-            summary_response = litellm.completion(
+            summary_response = _litellm().completion(
                 model=summary_model,
                 messages=[
                     {"role": "user", "content": [{"type": "text", "text":
@@ -3778,8 +4278,8 @@ class LibreGeoLensDockWidget(QDockWidget):
                 break
             image_metadata = self.image_display_widget.images[idx]
             request = QgsFeatureRequest().setFilterExpression(
-                f'"ChipId" = \'{image_metadata.get("chip_id", "")}\''
-            )
+                QgsExpression.createFieldEqualityExpression("ChipId", str(image_metadata.get("chip_id", "")))
+            ).setFlags(QgsFeatureRequest.NoGeometry)
             for feature in self.log_layer.getFeatures(request):
                 feat_attrs = feature.attributes()
                 interactions = feat_attrs[0]
@@ -3837,10 +4337,7 @@ class LibreGeoLensDockWidget(QDockWidget):
                     self.cancel_mllm_button.setEnabled(False)
                 self._unlock_ui_after_stream()
             return
-        worker = ctx.pop("worker", None)
-        thread = ctx.pop("thread", None)
-        if thread and thread.isRunning():
-            thread.quit()
+        ctx.pop("worker", None)
         if not self.active_streams:
             if hasattr(self, "cancel_mllm_button"):
                 self.cancel_mllm_button.setEnabled(False)
@@ -4002,32 +4499,27 @@ class LibreGeoLensDockWidget(QDockWidget):
         os.makedirs(images_folder_path, exist_ok=True)
         
         # Collect all chips used in this chat
-        all_chip_ids = []
-        for interaction_id in interactions_sequence:
-            (_, _, _, chip_ids, _, _, chip_modes, _, _, _) = self.logs_db.fetch_interaction_by_id(interaction_id)
-            all_chip_ids.extend(json.loads(chip_ids))
+        chat_chips = self.logs_db.fetch_chips_for_interactions(interactions_sequence)
         
         # Copy all chip images to the export folder
         chip_path_mapping = {}  # Original path -> exported path mapping
-        for chip_id in all_chip_ids:
-            chip = self.logs_db.fetch_chip_by_id(chip_id)
-            if chip:
-                original_path = chip[1]
-                filename = os.path.basename(original_path)
-                exported_path = os.path.join(images_folder_path, filename)
+        for chip in chat_chips:
+            original_path = chip[1]
+            filename = os.path.basename(original_path)
+            exported_path = os.path.join(images_folder_path, filename)
+            
+            # Copy image file if it exists
+            if os.path.exists(original_path):
+                shutil.copy2(original_path, exported_path)
+                chip_path_mapping[original_path] = os.path.join("images", filename)
                 
-                # Copy image file if it exists
-                if os.path.exists(original_path):
-                    shutil.copy2(original_path, exported_path)
-                    chip_path_mapping[original_path] = os.path.join("images", filename)
-                    
-                    # Check for raw version
-                    raw_path = original_path.replace("_screen.png", "_raw.png")
-                    if os.path.exists(raw_path):
-                        raw_filename = os.path.basename(raw_path)
-                        exported_raw_path = os.path.join(images_folder_path, raw_filename)
-                        shutil.copy2(raw_path, exported_raw_path)
-                        chip_path_mapping[raw_path] = os.path.join("images", raw_filename)
+                # Check for raw version
+                raw_path = original_path.replace("_screen.png", "_raw.png")
+                if os.path.exists(raw_path):
+                    raw_filename = os.path.basename(raw_path)
+                    exported_raw_path = os.path.join(images_folder_path, raw_filename)
+                    shutil.copy2(raw_path, exported_raw_path)
+                    chip_path_mapping[raw_path] = os.path.join("images", raw_filename)
         
         # Generate HTML for the chat
         html_content = self._generate_chat_html(interactions_sequence, chip_path_mapping)
@@ -4038,7 +4530,7 @@ class LibreGeoLensDockWidget(QDockWidget):
             html_file.write(html_content)
         
         # Export GeoJSON features related to this chat
-        self._export_chat_geojson(export_folder_path, all_chip_ids)
+        self._export_chat_geojson(export_folder_path, {chip[0] for chip in chat_chips})
 
         self.open_directory(export_folder_path)
         
@@ -4163,12 +4655,12 @@ class LibreGeoLensDockWidget(QDockWidget):
             
             # Process chips
             chip_ids_list = json.loads(chip_ids)
-            chip_modes_list = ast.literal_eval(chip_modes)
+            chip_modes_list = _load_sequence_column(chip_modes)
             
             try:
-                original_resolutions_list = ast.literal_eval(original_resolutions) if original_resolutions else []
-                actual_resolutions_list = ast.literal_eval(actual_resolutions) if actual_resolutions else []
-            except (TypeError, json.JSONDecodeError):
+                original_resolutions_list = _load_sequence_column(original_resolutions) or []
+                actual_resolutions_list = _load_sequence_column(actual_resolutions) or []
+            except (TypeError, ValueError, SyntaxError):
                 original_resolutions_list = []
                 actual_resolutions_list = []
             
@@ -4203,7 +4695,7 @@ class LibreGeoLensDockWidget(QDockWidget):
                         
                         html += f'''<div class="chip">
     <img src="{relative_path}" alt="Image chip">
-    <span class="chip-label">{"Raw" if chip_mode == "raw" else "Screen"} Chip</span>
+    <span class="chip-label">{_CHIP_MODE_LABELS.get(chip_mode, _DEFAULT_CHIP_MODE_LABEL)} Chip</span>
     <span class="resolution-label">{resolution_text}</span>
 </div>\n'''
                 
@@ -4212,13 +4704,13 @@ class LibreGeoLensDockWidget(QDockWidget):
             # Assistant response
             html += (
                 f'<div class="assistant-message">\n'
-                f'<strong>{mllm_model} ({mllm_service}):</strong> {markdown.markdown(response)}\n'
+                f'<strong>{mllm_model} ({mllm_service}):</strong> {_markdown_to_html(response)}\n'
                 f'</div>\n'
             )
 
             normalized_reasoning = reasoning_output if reasoning_output not in (None, "", "None") else None
             if normalized_reasoning:
-                reasoning_body = markdown.markdown(normalized_reasoning)
+                reasoning_body = _markdown_to_html(normalized_reasoning)
                 html += (
                     '<details class="reasoning-block">\n'
                     '    <summary>Reasoning</summary>\n'
@@ -3,7 +3,6 @@ from qgis.PyQt.QtGui import QIcon, QColor
 from qgis.PyQt.QtWidgets import QAction, QFileDialog, QMessageBox
 
 from .resources import *
-from .dock import LibreGeoLensDockWidget
 from .settings import SettingsDialog
 from .utils.logger import get_logger
 
@@ -44,6 +43,8 @@ class LibreGeoLens:
     def run(self):
         logger.info("Opening LibreGeoLens dock widget")
         if self.dock_widget is None:
+            # Imported on first run: the dock pulls in rasterio, numpy, pyproj and PIL, which slow down plugin load
+            from .dock import LibreGeoLensDockWidget
             self.dock_widget = LibreGeoLensDockWidget(self.iface)
         self.iface.addDockWidget(Qt.RightDockWidgetArea, self.dock_widget)
         self.dock_widget.setAllowedAreas(Qt.RightDockWidgetArea)
@@ -54,4 +55,10 @@ class LibreGeoLens:
             self.iface.removePluginMenu(self.name, action)
             self.iface.removeToolBarIcon(action)
         if self.dock_widget:
+            # The MLLM event loop is only ever started by the dock, so it can only be running if the dock exists
+            from .dock import stop_async_loop
+            # Silenced first so the cancelled requests can't emit into the dock while the loop shuts down
+            self.dock_widget.cancel_mllm_workers(silence_done=True)
             self.iface.removeDockWidget(self.dock_widget)
+            self.dock_widget.logs_db.close()
+            stop_async_loop()
@@ -1,4 +1,3 @@
-import boto3
 import os
 from PyQt5.QtCore import QSettings
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QLineEdit, QPushButton, QFileDialog, QMessageBox
@@ -55,6 +54,7 @@ class SettingsDialog(QDialog):
 
         self.load_settings()
 
+        import boto3
         self.s3 = boto3.client('s3')
 
     def load_settings(self):